@@ -0,0 +1,180 @@
+"""
+Dynamic micro-batching for model inference
+
+Concurrent /predict requests for the same language are collected for a few
+milliseconds and run through the model as a single padded forward pass.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+from executor import run_inference
+
+logger = logging.getLogger(__name__)
+
+# Batching configuration
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "16"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "5"))
+
+# Bulk endpoint: forward-pass size for length-sorted buckets
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "32"))
+
+# (language, texts) -> [(label, confidence), ...] in input order
+InferenceFn = Callable[[str, List[str]], List[Tuple[str, float]]]
+
+
+def length_buckets(
+    lengths: List[int], bucket_size: int = BULK_BATCH_SIZE
+) -> List[List[int]]:
+    """
+    Group item indices into buckets of similar length to minimize padding
+    Indices are sorted by length and chunked into buckets of bucket_size
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    bucket_size = max(1, bucket_size)
+    return [order[i : i + bucket_size] for i in range(0, len(order), bucket_size)]
+
+
+class MicroBatcher:
+    """
+    Queue of pending texts for one language, flushed when the batch is full
+    or the oldest request has waited max_wait_ms
+    """
+
+    def __init__(
+        self,
+        language: str,
+        infer_fn: InferenceFn,
+        max_batch_size: int = BATCH_MAX_SIZE,
+        max_wait_ms: float = BATCH_MAX_WAIT_MS,
+    ):
+        self.language = language
+        self.infer_fn = infer_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker: Optional[asyncio.Task] = None
+
+        # Counters for /health
+        self.batches_run = 0
+        self.items_processed = 0
+        self.largest_batch = 0
+
+    async def submit(self, text: str) -> Tuple[str, float]:
+        """Queue a text and wait for its (label, confidence)"""
+        if self.worker is None or self.worker.done():
+            self.queue = asyncio.Queue()
+            self.worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((text, future))
+        return await future
+
+    async def _run(self):
+        """Worker loop: collect a batch, run it, repeat"""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Anything that arrived while we were waiting can ride along for free
+            while len(batch) < self.max_batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            await self._run_batch(batch)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Run one forward pass and fan results back out to the waiters"""
+        texts = [text for text, _ in batch]
+
+        try:
+            results = await run_inference(self.infer_fn, self.language, texts)
+        except Exception as e:
+            logger.error(
+                f"Batch inference failed for {self.language} ({len(texts)} items): "
+                f"{str(e)}"
+            )
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches_run += 1
+        self.items_processed += len(texts)
+        self.largest_batch = max(self.largest_batch, len(texts))
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        """Batching counters for this language"""
+        return {
+            "batches_run": self.batches_run,
+            "items_processed": self.items_processed,
+            "average_batch_size": (
+                round(self.items_processed / self.batches_run, 2)
+                if self.batches_run
+                else 0
+            ),
+            "largest_batch": self.largest_batch,
+            "queued": self.queue.qsize() if self.queue else 0,
+        }
+
+    async def close(self):
+        """Stop the worker task"""
+        if self.worker and not self.worker.done():
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+
+
+class BatchScheduler:
+    """Per-language micro-batchers sharing one inference function"""
+
+    def __init__(
+        self,
+        infer_fn: InferenceFn,
+        max_batch_size: int = BATCH_MAX_SIZE,
+        max_wait_ms: float = BATCH_MAX_WAIT_MS,
+    ):
+        self.infer_fn = infer_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.batchers: Dict[str, MicroBatcher] = {}
+
+    async def submit(self, language: str, text: str) -> Tuple[str, float]:
+        """Classify a single text through the language's batch queue"""
+        if language not in self.batchers:
+            self.batchers[language] = MicroBatcher(
+                language, self.infer_fn, self.max_batch_size, self.max_wait_ms
+            )
+        return await self.batchers[language].submit(text)
+
+    def stats(self) -> dict:
+        """Batching configuration and per-language counters"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "languages": {lang: b.stats() for lang, b in self.batchers.items()},
+        }
+
+    async def close(self):
+        """Stop all worker tasks"""
+        for batcher in self.batchers.values():
+            await batcher.close()
+        logger.info("Batch scheduler stopped")
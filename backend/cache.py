@@ -0,0 +1,231 @@
+"""
+Bounded in-memory result cache
+
+An LRU cache with per-entry TTLs, capped by entry count and by approximate
+size in bytes. Expired entries are dropped on read and by a periodic
+background sweep, so memory stays bounded under diverse traffic.
+
+Keys are built from a canonical form of the text, so inputs that differ only
+in Unicode normalization, invisible characters, spacing or trailing
+punctuation share one entry. A cache can be backed by a persistent
+second-level store that misses read through to and stores write through to.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+# Byte cap across all entries (0 = none)
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_SWEEP_INTERVAL = float(os.getenv("CACHE_SWEEP_INTERVAL", "60"))
+
+# Zero-width space/joiners, word joiner, BOM and soft hyphen
+_INVISIBLE = dict.fromkeys(map(ord, "\u200b\u200c\u200d\u2060\ufeff\u00ad"), None)
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s.!?।॥,;:…]+$")
+
+
+def canonical_text(text: str) -> str:
+    """NFC text without invisible characters, extra spacing or trailing punctuation"""
+    text = unicodedata.normalize("NFC", text).translate(_INVISIBLE)
+    text = _WHITESPACE.sub(" ", text).strip()
+    return _TRAILING_PUNCTUATION.sub("", text)
+
+
+def cache_key(*parts: str) -> str:
+    """Hash of the given key parts"""
+    return hashlib.md5("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory cost of a JSON-like value"""
+    try:
+        return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return 1024
+
+
+class TTLCache:
+    """LRU cache with per-entry expiry and entry/byte limits"""
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        max_bytes: int = CACHE_MAX_BYTES,
+        default_ttl: float = 3600,
+        backing=None,
+        namespace: Optional[str] = None,
+    ):
+        self.name = name
+        self.backing = backing  # PersistentCache shared across workers, or None
+        self.namespace = namespace or name  # key space in the backing store
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        # Key -> (value, expires_at, size), least recently used first
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.backing_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self.bytes -= size
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= time.time():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        # Read through to the persistent tier and keep the result in memory
+        stored = self.backing.get(self.namespace, key) if self.backing else None
+        if stored is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = stored
+        self._store(key, value, expires_at)
+        self.backing_hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        expires_at = time.time() + (ttl or self.default_ttl)
+        self._store(key, value, expires_at)
+        if self.backing:
+            self.backing.set(self.namespace, key, value, expires_at)
+
+    def _store(self, key: str, value: Any, expires_at: float):
+        size = estimate_size(value)
+        if self.max_bytes and size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at, size)
+            self.bytes += size
+
+            # Evict least recently used entries until within both limits
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes and self.bytes > self.max_bytes)
+            ):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+        if self.backing:
+            self.backing.delete(self.namespace, key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def sweep(self) -> int:
+        """Drop every expired entry; returns how many were removed"""
+        now = time.time()
+        with self._lock:
+            expired = [
+                key
+                for key, (_, expires_at, _) in self._entries.items()
+                if expires_at <= now
+            ]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+        return len(expired)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.backing_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "persistent_hits": self.backing_hits,
+                "misses": self.misses,
+                "hit_rate": (
+                    round((self.hits + self.backing_hits) / lookups, 4)
+                    if lookups
+                    else None
+                ),
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one computation
+
+    The first caller starts the work as its own task; callers arriving while it
+    runs await the same task and share its result or exception. The task is
+    shielded, so a caller that disconnects doesn't cancel it for the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "computed": self.leaders,
+            "coalesced": self.coalesced,
+        }
+
+
+async def run_sweeper(*caches: TTLCache, interval: float = CACHE_SWEEP_INTERVAL):
+    """Background task expiring entries of the given caches every interval seconds"""
+    while True:
+        await asyncio.sleep(interval)
+        for cache in caches:
+            removed = await asyncio.to_thread(cache.sweep)
+            if removed:
+                logger.info(f"Expired {removed} entries from {cache.name} cache")
@@ -0,0 +1,237 @@
+"""
+Confidence-based model cascade
+
+A cheap first-stage scorer classifies every text; only texts whose
+first-stage confidence is below CASCADE_THRESHOLD are escalated to the full
+model. The first stage is a distilled checkpoint in models/<language>_model_small
+when one exists (it must use the same tokenizer), otherwise the full model cut
+down to its first CASCADE_LAYERS encoder layers, sharing the full model's
+weights.
+
+A random CASCADE_AUDIT_RATE sample of texts is also scored by the full model
+regardless of confidence. Those pairs give an unbiased agreement estimate and a
+threshold sweep showing the hit rate and agreement each threshold would yield.
+"""
+
+import copy
+import itertools
+import logging
+import os
+import random
+import threading
+import weakref
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+
+logger = logging.getLogger(__name__)
+
+# Cascade configuration
+MODEL_CASCADE = os.getenv("MODEL_CASCADE", "false").lower() == "true"
+CASCADE_THRESHOLD = float(os.getenv("CASCADE_THRESHOLD", "0.9"))
+CASCADE_LAYERS = int(os.getenv("CASCADE_LAYERS", "4"))
+CASCADE_AUDIT_RATE = float(os.getenv("CASCADE_AUDIT_RATE", "0.05"))
+CASCADE_MODEL_SUFFIX = "_model_small"
+
+# Audited (confidence, agreed) pairs kept per language for the threshold sweep
+AUDIT_HISTORY = 5000
+SWEEP_THRESHOLDS = (0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 0.99)
+
+
+def _encoder_layers(model) -> Tuple[Optional[str], Optional[torch.nn.ModuleList]]:
+    """Find the stack of transformer layers (encoder.layer, transformer.layer, ...)"""
+    for name, module in model.named_modules():
+        if (
+            isinstance(module, torch.nn.ModuleList)
+            and name.split(".")[-1] in ("layer", "layers")
+            and len(module) > 1
+        ):
+            return name, module
+    return None, None
+
+
+def truncate_layers(model, num_layers: int):
+    """
+    Copy of a transformer classifier that runs only its first num_layers
+    encoder layers. Parameters and buffers are shared with the original.
+    """
+    if not isinstance(model, torch.nn.Module):
+        return None
+
+    layers_name, layers = _encoder_layers(model)
+    if layers is None or num_layers >= len(layers):
+        return None
+
+    # Pre-seed deepcopy's memo so every tensor maps to itself instead of a copy
+    memo = {
+        id(tensor): tensor
+        for tensor in itertools.chain(model.parameters(), model.buffers())
+    }
+    stage = copy.deepcopy(model, memo)
+
+    parent_name, _, attr = layers_name.rpartition(".")
+    parent = stage.get_submodule(parent_name) if parent_name else stage
+    setattr(parent, attr, torch.nn.ModuleList(list(getattr(parent, attr))[:num_layers]))
+    if hasattr(stage, "config"):
+        stage.config.num_hidden_layers = num_layers
+
+    stage.eval()
+    return stage
+
+
+class CascadeStats:
+    """Per-language counters and audit samples"""
+
+    def __init__(self):
+        self.total = 0
+        self.accepted = 0
+        self.escalated = 0
+        self.escalated_agreed = 0
+        self.audits = deque(maxlen=AUDIT_HISTORY)  # (first-stage confidence, agreed)
+
+    def report(self) -> dict:
+        audited = len(self.audits)
+        agreed = sum(1 for _, ok in self.audits if ok)
+
+        sweep = []
+        for t in SWEEP_THRESHOLDS:
+            kept = [ok for confidence, ok in self.audits if confidence >= t]
+            sweep.append(
+                {
+                    "threshold": t,
+                    "hit_rate": round(len(kept) / audited, 4) if audited else None,
+                    # Escalated texts get the full model's answer, so they always agree
+                    "agreement": (
+                        round((sum(kept) + audited - len(kept)) / audited, 4)
+                        if audited
+                        else None
+                    ),
+                }
+            )
+
+        return {
+            "texts": self.total,
+            "first_stage_hits": self.accepted,
+            "escalated": self.escalated,
+            "hit_rate": round(self.accepted / self.total, 4) if self.total else None,
+            "escalated_agreement": (
+                round(self.escalated_agreed / self.escalated, 4)
+                if self.escalated
+                else None
+            ),
+            "audited": audited,
+            "audit_agreement": round(agreed / audited, 4) if audited else None,
+            "threshold_sweep": sweep,
+        }
+
+
+class Cascade:
+    """First-stage models and routing between them and the full models"""
+
+    def __init__(
+        self,
+        threshold: float = CASCADE_THRESHOLD,
+        audit_rate: float = CASCADE_AUDIT_RATE,
+    ):
+        self.threshold = threshold
+        self.audit_rate = audit_rate
+        # Keyed weakly by the full model so an evicted model's first stage goes with it
+        self.first_stages: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self.sources: Dict[str, str] = {}
+        self.stats: Dict[str, CascadeStats] = {}
+        self._lock = threading.Lock()
+
+    def prepare(
+        self,
+        language: str,
+        model,
+        small_model_path: Path,
+        load_fn: Callable[[Path], object],
+    ):
+        """Build or load the first stage for a freshly loaded full model"""
+        stage, source = None, None
+
+        if small_model_path.exists():
+            try:
+                stage, source = load_fn(small_model_path), "distilled"
+            except Exception as e:
+                logger.warning(
+                    f"Failed to load {small_model_path.name}, falling back to layer "
+                    f"truncation: {str(e)}"
+                )
+
+        if stage is None:
+            stage = truncate_layers(model, CASCADE_LAYERS)
+            source = f"truncated:{CASCADE_LAYERS}"
+
+        if stage is None:
+            logger.warning(
+                f"✗ No first-stage model for {language}, cascade disabled for it"
+            )
+            return
+
+        self.first_stages[model] = stage
+        self.sources[language] = source
+        logger.info(f"✓ Cascade first stage for {language}: {source}")
+
+    def run(
+        self,
+        language: str,
+        model,
+        texts: List[str],
+        predict_fn: Callable[[object, List[str]], np.ndarray],
+    ) -> np.ndarray:
+        """
+        Class probabilities for texts, escalating low-confidence first-stage
+        results (and a random audit sample) to the full model
+        """
+        stage = self.first_stages.get(model)
+        if stage is None:
+            return predict_fn(model, texts)
+
+        probabilities = predict_fn(stage, texts)
+        confidences = probabilities.max(axis=1)
+        escalate = confidences < self.threshold
+        audit = np.array([random.random() < self.audit_rate for _ in texts], dtype=bool)
+
+        indices = np.flatnonzero(escalate | audit)
+        agreed = np.array([], dtype=bool)
+        if len(indices):
+            full = predict_fn(model, [texts[i] for i in indices])
+            agreed = probabilities[indices].argmax(axis=1) == full.argmax(axis=1)
+            probabilities[indices] = full
+
+        with self._lock:
+            stats = self.stats.setdefault(language, CascadeStats())
+            stats.total += len(texts)
+            stats.escalated += int(escalate.sum())
+            stats.accepted += len(texts) - int(escalate.sum())
+            for i, ok in zip(indices.tolist(), agreed.tolist()):
+                if escalate[i]:
+                    stats.escalated_agreed += ok
+                if audit[i]:
+                    stats.audits.append((float(confidences[i]), ok))
+
+        return probabilities
+
+    def report(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": MODEL_CASCADE,
+                "threshold": self.threshold,
+                "audit_rate": self.audit_rate,
+                "languages": {
+                    language: {
+                        "first_stage": self.sources.get(language),
+                        **self.stats.get(language, CascadeStats()).report(),
+                    }
+                    for language in sorted(set(self.sources) | set(self.stats))
+                },
+            }
+
+
+# Shared instance used by the API
+cascade = Cascade()
@@ -0,0 +1,108 @@
+"""
+One-time conversion of model checkpoints for faster startup
+
+- Rewrites pytorch_model.bin checkpoints as model.safetensors, which the
+  backend memory-maps at load time instead of unpickling
+- Saves a tokenizer.json for tokenizers that only ship slow (sentencepiece /
+  vocab) files, so startup no longer converts them on every load
+
+Usage:
+    python convert_checkpoints.py [--languages hindi tamil] [--remove-bin]
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+MODEL_BASE_PATH = Path(__file__).parent.parent / "models"
+LANGUAGES = ["hindi", "tamil", "telugu", "kannada"]
+
+
+def convert_weights(model_path: Path, remove_bin: bool) -> bool:
+    """Write model.safetensors next to pytorch_model.bin"""
+    bin_path = model_path / "pytorch_model.bin"
+    safetensors_path = model_path / "model.safetensors"
+
+    if safetensors_path.exists():
+        logger.info(f"  ✓ Already has {safetensors_path.name}")
+        return True
+    if not bin_path.exists():
+        logger.warning("  ✗ No pytorch_model.bin or model.safetensors found")
+        return False
+
+    model = AutoModelForSequenceClassification.from_pretrained(
+        str(model_path), num_labels=2
+    )
+    # save_pretrained handles tied/shared tensors that safetensors refuses to duplicate
+    model.save_pretrained(str(model_path), safe_serialization=True)
+    logger.info(f"  ✓ Wrote {safetensors_path.name}")
+
+    if remove_bin:
+        bin_path.unlink()
+        logger.info(f"  ✓ Removed {bin_path.name}")
+    return True
+
+
+def convert_tokenizer(model_path: Path) -> bool:
+    """Save a fast tokenizer.json if the checkpoint lacks one"""
+    if (model_path / "tokenizer.json").exists():
+        logger.info("  ✓ Already has tokenizer.json")
+        return True
+
+    try:
+        tokenizer = AutoTokenizer.from_pretrained(str(model_path), use_fast=True)
+    except Exception as e:
+        logger.warning(
+            "  ✗ Fast tokenizer conversion failed, startup will keep using the slow "
+            f"tokenizer: {str(e)}"
+        )
+        return False
+
+    if not tokenizer.is_fast:
+        logger.warning("  ✗ No fast tokenizer available for this model")
+        return False
+
+    tokenizer.save_pretrained(str(model_path))
+    logger.info("  ✓ Wrote tokenizer.json")
+    return True
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Convert model checkpoints for fast startup"
+    )
+    parser.add_argument("--languages", nargs="+", default=LANGUAGES, choices=LANGUAGES)
+    parser.add_argument("--models-dir", type=Path, default=MODEL_BASE_PATH)
+    parser.add_argument(
+        "--remove-bin",
+        action="store_true",
+        help="Delete pytorch_model.bin after writing model.safetensors",
+    )
+    args = parser.parse_args()
+
+    ok = True
+    for lang in args.languages:
+        model_path = args.models_dir / f"{lang}_model"
+        logger.info(f"[{lang.upper()}] {model_path}")
+
+        if not model_path.exists():
+            logger.warning("  ✗ Model directory not found")
+            ok = False
+            continue
+
+        ok = convert_weights(model_path, args.remove_bin) and ok
+        ok = convert_tokenizer(model_path) and ok
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+Weight and tokenizer deduplication across language models
+
+Language models fine-tuned from the same multilingual base often ship
+identical tokenizer files and identical tensors (typically the embedding
+matrices). At load time tokenizers are fingerprinted by their vocab files and
+tensors by a content hash; a match reuses the object already in memory so
+each copy is held only once.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import weakref
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+# Deduplication configuration
+MODEL_DEDUP = os.getenv("MODEL_DEDUP", "true").lower() == "true"
+# Tensors smaller than this are not hashed
+DEDUP_MIN_BYTES = int(os.getenv("DEDUP_MIN_BYTES", str(1024 * 1024)))
+
+# Files that fully determine a tokenizer
+TOKENIZER_FILES = (
+    "tokenizer.json",
+    "tokenizer_config.json",
+    "special_tokens_map.json",
+    "added_tokens.json",
+    "vocab.txt",
+    "vocab.json",
+    "merges.txt",
+    "sentencepiece.bpe.model",
+    "spiece.model",
+)
+
+# Reentrant: an owner entry is dropped when its object is freed, possibly under the lock
+_lock = threading.RLock()
+
+# Weak references so an evicted model's tensors are freed once nothing uses them
+_tokenizers: "weakref.WeakValueDictionary[str, object]" = weakref.WeakValueDictionary()
+_tensors: "weakref.WeakValueDictionary[str, torch.Tensor]" = (
+    weakref.WeakValueDictionary()
+)
+# Fingerprint -> (language that first loaded it, registration token)
+_owners: Dict[str, Tuple[str, object]] = {}
+
+# Per-language savings for /models/info
+dedup_reports: Dict[str, dict] = {}
+
+
+def _register(key: str, obj, language: str):
+    """Record the owner of a shared object until it is freed (call under _lock)"""
+    token = object()
+    _owners[key] = (language, token)
+    weakref.finalize(obj, _forget_owner, key, token)
+
+
+def _forget_owner(key: str, token: object):
+    with _lock:
+        # A newer object may have been registered under the same key since
+        if _owners.get(key, (None, None))[1] is token:
+            del _owners[key]
+
+
+def tokenizer_fingerprint(model_path: Path) -> Optional[str]:
+    """SHA-256 over the tokenizer files present in a model directory"""
+    digest = hashlib.sha256()
+    found = False
+
+    for name in TOKENIZER_FILES:
+        path = model_path / name
+        if path.exists():
+            found = True
+            digest.update(name.encode())
+            digest.update(path.read_bytes())
+
+    return digest.hexdigest() if found else None
+
+
+def load_shared_tokenizer(
+    language: str, model_path: Path, load_fn: Callable[[], object]
+) -> Tuple[object, Optional[str]]:
+    """
+    Return an already-loaded identical tokenizer, or load and register one
+
+    Returns:
+        (tokenizer, language it is shared with or None)
+    """
+    fingerprint = tokenizer_fingerprint(model_path) if MODEL_DEDUP else None
+    if fingerprint is None:
+        return load_fn(), None
+
+    key = f"tokenizer:{fingerprint}"
+    with _lock:
+        existing = _tokenizers.get(key)
+        if existing is not None:
+            owner = _owners[key][0]
+            logger.info(
+                f"✓ Reusing {owner} tokenizer for {language} (identical vocab files)"
+            )
+            return existing, owner
+
+    tokenizer = load_fn()
+
+    with _lock:
+        # Another thread may have loaded the same tokenizer meanwhile; keep the first
+        existing = _tokenizers.get(key)
+        if existing is not None:
+            return existing, _owners[key][0]
+        _tokenizers[key] = tokenizer
+        _register(key, tokenizer, language)
+    return tokenizer, None
+
+
+def _tensor_key(tensor: torch.Tensor) -> str:
+    """Content hash of a tensor, including dtype and shape"""
+    raw = tensor.detach().contiguous().reshape(-1).view(torch.uint8).numpy()
+    digest = hashlib.sha256(raw.data).hexdigest()
+    return f"tensor:{tensor.dtype}:{tuple(tensor.shape)}:{digest}"
+
+
+def share_weights(language: str, model) -> dict:
+    """
+    Replace parameters and buffers identical to ones already loaded by another
+    model with the existing tensors. Call before the model is put into service.
+
+    Returns:
+        Report with the number of shared tensors and the bytes saved
+    """
+    report = {"shared_tensors": 0, "shared_mb": 0.0, "shared_with": []}
+    if not MODEL_DEDUP or not isinstance(model, torch.nn.Module):
+        return report
+
+    shared_bytes = 0
+    shared_with = set()
+
+    for module in model.modules():
+        for registry in (module._parameters, module._buffers):
+            for name, tensor in list(registry.items()):
+                if tensor is None:
+                    continue
+
+                nbytes = tensor.numel() * tensor.element_size()
+                if nbytes < DEDUP_MIN_BYTES:
+                    continue
+
+                try:
+                    key = _tensor_key(tensor)
+                except (RuntimeError, TypeError):
+                    # Quantized and other exotic tensors can't be viewed as raw bytes
+                    continue
+
+                with _lock:
+                    existing = _tensors.get(key)
+                    if existing is None:
+                        _tensors[key] = tensor
+                        _register(key, tensor, language)
+                        continue
+                    owner = _owners[key][0]
+
+                if existing is tensor:
+                    continue
+
+                registry[name] = existing
+                shared_bytes += nbytes
+                shared_with.add(owner)
+                report["shared_tensors"] += 1
+
+    report["shared_mb"] = round(shared_bytes / 1024 / 1024, 2)
+    report["shared_with"] = sorted(shared_with)
+
+    if report["shared_tensors"]:
+        logger.info(
+            f"✓ {language} shares {report['shared_tensors']} tensors "
+            f"({report['shared_mb']} MB) "
+            f"with {', '.join(report['shared_with'])}"
+        )
+    return report
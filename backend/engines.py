@@ -0,0 +1,299 @@
+"""
+Pluggable inference engines
+
+The PyTorch engine runs the Hugging Face models eagerly, as before. The ONNX
+engine exports each {lang}_model directory to model.onnx once, caches the file
+next to the checkpoint and serves it through ONNX Runtime with full graph
+optimizations. Select one per deployment with INFERENCE_ENGINE.
+"""
+
+import importlib.util
+import inspect
+import logging
+import os
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+from quantization import (
+    apply_quantization,
+    model_size_bytes,
+    parity_check,
+    quantization_enabled,
+    quantize_onnx_file,
+)
+from token_budget import tokenize
+from transformers import AutoConfig, AutoModelForSequenceClassification
+
+logger = logging.getLogger(__name__)
+
+# Engine configuration
+INFERENCE_ENGINE = os.getenv("INFERENCE_ENGINE", "pytorch").lower()  # pytorch | onnx
+ONNX_OPSET = int(os.getenv("ONNX_OPSET", "14"))
+ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", "0"))  # 0 = ORT default
+
+# low_cpu_mem_usage skips random weight init before loading, but needs accelerate
+LOW_CPU_MEM_USAGE = importlib.util.find_spec("accelerate") is not None
+
+
+class InferenceEngine:
+    """Loads a language model and turns tokenized batches into probabilities"""
+
+    name = "base"
+
+    def load_model(
+        self, language: str, model_path: Path, tokenizer, timings: Optional[dict] = None
+    ) -> Tuple[object, Optional[dict]]:
+        """
+        Load the model for a language
+
+        Args:
+            timings: Filled with per-phase load durations in seconds
+
+        Returns:
+            (model handle, quantization report or None)
+        """
+        raise NotImplementedError
+
+    def predict_proba(
+        self,
+        model,
+        tokenizer,
+        texts: List[str],
+        max_length: int = 512,
+        pad_to_multiple_of: Optional[int] = None,
+    ) -> np.ndarray:
+        """Class probabilities of shape (len(texts), num_labels)"""
+        raise NotImplementedError
+
+    def model_info(self, model) -> dict:
+        """Parameter counts and in-memory size for /models/info"""
+        raise NotImplementedError
+
+
+class TorchEngine(InferenceEngine):
+    """Eager PyTorch inference (the original path)"""
+
+    name = "pytorch"
+
+    def load_model(self, language, model_path, tokenizer, timings=None):
+        timings = {} if timings is None else timings
+
+        # safetensors checkpoints are memory-mapped instead of read and unpickled
+        started = time.perf_counter()
+        model = AutoModelForSequenceClassification.from_pretrained(
+            str(model_path),
+            num_labels=2,
+            use_safetensors=(model_path / "model.safetensors").exists() or None,
+            low_cpu_mem_usage=LOW_CPU_MEM_USAGE,
+        )
+        timings["weights"] = round(time.perf_counter() - started, 3)
+
+        started = time.perf_counter()
+        model.eval()
+        timings["eval"] = round(time.perf_counter() - started, 3)
+
+        # Optional dynamic int8 quantization with parity check
+        if quantization_enabled():
+            started = time.perf_counter()
+            model, report = apply_quantization(language, model, tokenizer)
+            timings["quantization"] = round(time.perf_counter() - started, 3)
+            return model, report
+        return model, None
+
+    def predict_proba(
+        self, model, tokenizer, texts, max_length=512, pad_to_multiple_of=None
+    ):
+        import torch
+
+        inputs = tokenize(
+            tokenizer,
+            texts,
+            return_tensors="pt",
+            truncation=True,
+            max_length=max_length,
+            padding=True,
+            pad_to_multiple_of=pad_to_multiple_of,
+        )
+
+        with torch.no_grad():
+            outputs = model(**inputs)
+            return torch.softmax(outputs.logits, dim=1).numpy()
+
+    def model_info(self, model):
+        return {
+            "total_parameters": sum(p.numel() for p in model.parameters()),
+            "trainable_parameters": sum(
+                p.numel() for p in model.parameters() if p.requires_grad
+            ),
+            "model_size_mb": model_size_bytes(model) / 1024 / 1024,
+        }
+
+
+class OnnxModel:
+    """An ONNX Runtime session plus the metadata the API reports"""
+
+    def __init__(self, session, config, path: Path):
+        self.session = session
+        self.config = config
+        self.path = path
+        self.input_names = [i.name for i in session.get_inputs()]
+        self.total_parameters: Optional[int] = None
+
+
+class OnnxEngine(InferenceEngine):
+    """ONNX Runtime inference over a cached export of each checkpoint"""
+
+    name = "onnx"
+
+    def _export(self, model_path: Path, onnx_path: Path, tokenizer):
+        """Export a Hugging Face checkpoint to ONNX with dynamic batch/sequence axes"""
+        import torch
+
+        logger.info(f"Exporting {model_path.name} to ONNX (one-time)...")
+        model = AutoModelForSequenceClassification.from_pretrained(
+            str(model_path), num_labels=2
+        )
+        model.eval()
+
+        # Graph inputs follow the order of forward()'s signature, not the tokenizer's
+        sample = tokenizer(["export sample"], return_tensors="pt")
+        signature = inspect.signature(model.forward).parameters
+        input_names = [name for name in signature if name in sample]
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["logits"] = {0: "batch"}
+
+        # Write to a temp file first so a killed export never leaves a truncated cache
+        tmp_path = onnx_path.with_suffix(".onnx.tmp")
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                ({name: sample[name] for name in input_names},),
+                str(tmp_path),
+                input_names=input_names,
+                output_names=["logits"],
+                dynamic_axes=dynamic_axes,
+                opset_version=ONNX_OPSET,
+            )
+        os.replace(tmp_path, onnx_path)
+        logger.info(f"✓ Cached ONNX model at {onnx_path}")
+
+    def _is_stale(self, onnx_path: Path, model_path: Path) -> bool:
+        """True if the export is missing or older than the checkpoint weights"""
+        if not onnx_path.exists():
+            return True
+        weights = [
+            p for p in model_path.iterdir() if p.suffix in (".bin", ".safetensors")
+        ]
+        return any(p.stat().st_mtime > onnx_path.stat().st_mtime for p in weights)
+
+    def _session(self, path: Path):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if ONNX_INTRA_OP_THREADS > 0:
+            options.intra_op_num_threads = ONNX_INTRA_OP_THREADS
+        return ort.InferenceSession(
+            str(path), options, providers=["CPUExecutionProvider"]
+        )
+
+    def load_model(self, language, model_path, tokenizer, timings=None):
+        timings = {} if timings is None else timings
+
+        onnx_path = model_path / "model.onnx"
+        if self._is_stale(onnx_path, model_path):
+            started = time.perf_counter()
+            self._export(model_path, onnx_path, tokenizer)
+            timings["export"] = round(time.perf_counter() - started, 3)
+
+        started = time.perf_counter()
+        config = AutoConfig.from_pretrained(str(model_path))
+        model = OnnxModel(self._session(onnx_path), config, onnx_path)
+        timings["weights"] = round(time.perf_counter() - started, 3)
+
+        if not quantization_enabled():
+            return model, None
+
+        started = time.perf_counter()
+
+        # int8 variant is cached alongside the fp32 export
+        int8_path = model_path / "model.int8.onnx"
+        if (
+            self._is_stale(int8_path, model_path)
+            or int8_path.stat().st_mtime < onnx_path.stat().st_mtime
+        ):
+            quantize_onnx_file(onnx_path, int8_path)
+        quantized = OnnxModel(self._session(int8_path), config, int8_path)
+
+        report = parity_check(
+            language,
+            lambda texts: self.predict_proba(model, tokenizer, texts),
+            lambda texts: self.predict_proba(quantized, tokenizer, texts),
+        )
+        report["fp32_size_mb"] = round(onnx_path.stat().st_size / 1024 / 1024, 2)
+        report["int8_size_mb"] = round(int8_path.stat().st_size / 1024 / 1024, 2)
+        report["quantized"] = report["passed"]
+        timings["quantization"] = round(time.perf_counter() - started, 3)
+
+        if not report["passed"]:
+            logger.warning(
+                f"✗ int8 ONNX parity check failed for {language}, keeping fp32 session"
+            )
+            return model, report
+
+        logger.info(
+            f"✓ Using int8 ONNX model for {language}: {report['fp32_size_mb']} MB → "
+            f"{report['int8_size_mb']} MB"
+        )
+        return quantized, report
+
+    def predict_proba(
+        self, model, tokenizer, texts, max_length=512, pad_to_multiple_of=None
+    ):
+        inputs = tokenize(
+            tokenizer,
+            texts,
+            return_tensors="np",
+            truncation=True,
+            max_length=max_length,
+            padding=True,
+            pad_to_multiple_of=pad_to_multiple_of,
+        )
+        feed = {name: inputs[name].astype(np.int64) for name in model.input_names}
+        logits = model.session.run(["logits"], feed)[0]
+
+        # Softmax over the label axis
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def model_info(self, model):
+        if model.total_parameters is None:
+            import onnx
+
+            graph = onnx.load(str(model.path), load_external_data=False).graph
+            model.total_parameters = sum(
+                int(np.prod(init.dims)) for init in graph.initializer
+            )
+
+        return {
+            "total_parameters": model.total_parameters,
+            "trainable_parameters": 0,
+            "model_size_mb": model.path.stat().st_size / 1024 / 1024,
+        }
+
+
+ENGINES = {
+    TorchEngine.name: TorchEngine,
+    OnnxEngine.name: OnnxEngine,
+}
+
+
+def create_engine(name: str = INFERENCE_ENGINE) -> InferenceEngine:
+    """Instantiate the configured engine, falling back to PyTorch for unknown names"""
+    if name not in ENGINES:
+        logger.warning(f"Unknown INFERENCE_ENGINE '{name}', using pytorch")
+        name = TorchEngine.name
+    logger.info(f"Inference engine: {name}")
+    return ENGINES[name]()
@@ -0,0 +1,84 @@
+"""
+Executors for blocking work
+
+Model inference runs on a bounded inference thread pool and blocking network
+calls such as translation and Gemini explanations run on a separate I/O thread
+pool, so the asyncio event loop stays free to serve /health, history and other
+requests. Inference stays in-process so every thread shares one copy of the
+models and their statistics; use serve.py for more processes.
+"""
+
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Optional
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+# Executor configuration
+INFERENCE_WORKERS = int(
+    os.getenv("INFERENCE_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+IO_WORKERS = int(os.getenv("IO_WORKERS", "16"))
+TORCH_NUM_THREADS = int(os.getenv("TORCH_NUM_THREADS", "0"))  # 0 = torch default
+
+inference_executor: Optional[ThreadPoolExecutor] = None
+io_executor: Optional[ThreadPoolExecutor] = None
+
+
+def configure_torch_threads(num_threads: int = TORCH_NUM_THREADS):
+    """Set torch intra-op threads so inference workers don't oversubscribe the CPU"""
+    if num_threads > 0:
+        torch.set_num_threads(num_threads)
+    logger.info(f"Torch intra-op threads: {torch.get_num_threads()}")
+
+
+def start_executors():
+    """Create the inference and I/O pools"""
+    global inference_executor, io_executor
+
+    configure_torch_threads(TORCH_NUM_THREADS)
+
+    inference_executor = ThreadPoolExecutor(
+        max_workers=INFERENCE_WORKERS, thread_name_prefix="inference"
+    )
+    io_executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="io")
+    logger.info(f"✓ Inference threads: {INFERENCE_WORKERS}, I/O threads: {IO_WORKERS}")
+
+
+def shutdown_executors():
+    """Shut down both pools"""
+    global inference_executor, io_executor
+
+    for executor in (inference_executor, io_executor):
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+    inference_executor = None
+    io_executor = None
+    logger.info("Executors shut down")
+
+
+async def run_inference(fn: Callable, *args, **kwargs):
+    """Run CPU-bound model work on the inference pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(inference_executor, partial(fn, *args, **kwargs))
+
+
+async def run_blocking(fn: Callable, *args, **kwargs):
+    """Run blocking I/O (translation, Gemini) on the I/O thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(io_executor, partial(fn, *args, **kwargs))
+
+
+def executor_stats() -> dict:
+    """Executor configuration for /health"""
+    return {
+        "inference_workers": INFERENCE_WORKERS,
+        "io_workers": IO_WORKERS,
+        "torch_threads": torch.get_num_threads(),
+        "running": inference_executor is not None,
+    }
@@ -0,0 +1,435 @@
+"""
+Gemini explanation service
+
+One shared Gemini model client used through its async API, with at most
+GEMINI_MAX_CONCURRENCY calls in flight and a GEMINI_TIMEOUT deadline per call.
+
+Concurrent requests are packed into one prompt of up to GEMINI_BATCH_SIZE
+metaphors (collected for at most GEMINI_BATCH_WAIT_MS); the JSON or numbered
+response is split back into per-item explanations, and items missing from it
+fall back to single-item calls.
+
+In deferred mode /predict doesn't wait for the explanation: it returns an
+explanation ID and the explanation is generated in the background. The ID is
+the explanation's cache key, so once the explanation exists any worker can
+answer a fetch from the shared cache (PERSISTENT_CACHE=true). While it is still
+pending only the worker running the job knows it; other workers answer 202 and
+keep checking the shared cache. Without the persistent tier, route a client's
+requests to one worker (sticky sessions).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import google.generativeai as genai
+
+logger = logging.getLogger(__name__)
+
+# Explanation configuration
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash-lite")
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "15"))
+EXPLANATION_MODE = os.getenv("EXPLANATION_MODE", "inline")  # inline | deferred
+# Seconds a finished job is kept
+EXPLANATION_JOB_TTL = int(os.getenv("EXPLANATION_JOB_TTL", "600"))
+# Metaphors per Gemini prompt (1 = one call per metaphor)
+GEMINI_BATCH_SIZE = int(os.getenv("GEMINI_BATCH_SIZE", "8"))
+GEMINI_BATCH_WAIT_MS = float(os.getenv("GEMINI_BATCH_WAIT_MS", "50"))
+
+UNCONFIGURED_MESSAGE = (
+    "⚠️ AI explanation unavailable - please configure GEMINI_API_KEY in .env file"
+)
+
+GENERATION_CONFIG = genai.types.GenerationConfig(
+    temperature=0.3,  # Lower temperature for more focused responses
+    max_output_tokens=100,
+)
+
+
+def build_prompt(text: str, language: str) -> str:
+    """Enhanced prompt for accurate metaphor explanations"""
+    return f"""Analyze this {language} metaphor and explain it in simple English.
+
+TEXT: "{text}"
+
+Provide a clear explanation that:
+1. Identifies what is being compared to what
+2. Explains the deeper meaning or message
+3. Is 1-2 sentences maximum
+4. Starts with "This metaphor..." or "It compares..."
+
+Example for "Life is a journey":
+"This metaphor compares life to a journey, suggesting that life is about the experiences and growth along the way, not just reaching the end goal."
+
+Your explanation (keep it concise and specific to this text):"""
+
+
+def build_batch_prompt(items: List[Tuple[str, str]]) -> str:
+    """One prompt covering several (text, language) metaphors"""
+    numbered = "\n".join(
+        f'{i}. [{language}] "{text}"' for i, (text, language) in enumerate(items, 1)
+    )
+    return f"""Analyze each numbered metaphor below and explain it in simple English.
+
+{numbered}
+
+For each metaphor, provide a clear explanation that:
+1. Identifies what is being compared to what
+2. Explains the deeper meaning or message
+3. Is 1-2 sentences maximum
+4. Starts with "This metaphor..." or "It compares..."
+
+Respond with only a JSON array containing one object per metaphor, in order:
+[{{"id": 1, "explanation": "..."}}, {{"id": 2, "explanation": "..."}}]"""
+
+
+_NUMBERED_LINE = re.compile(r"^\s*(\d+)[.):](?:\s+|$)(.*)$")
+
+
+def parse_batch_response(raw: str, count: int) -> Dict[int, str]:
+    """
+    Map item number (1-based) to explanation from a JSON array response,
+    falling back to a numbered list; unparseable items are left out
+    """
+    text = raw.strip()
+    start, end = text.find("["), text.rfind("]")
+    if start != -1 and end > start:
+        try:
+            entries = json.loads(text[start : end + 1])
+            parsed = {}
+            for position, entry in enumerate(entries, 1):
+                if isinstance(entry, dict):
+                    number = entry.get("id", position)
+                    explanation = entry.get("explanation")
+                else:
+                    number, explanation = position, entry
+                if (
+                    isinstance(number, int)
+                    and 1 <= number <= count
+                    and isinstance(explanation, str)
+                    and explanation.strip()
+                ):
+                    parsed[number] = explanation
+            if parsed:
+                return parsed
+        except ValueError:
+            pass
+
+    # Numbered list: "1. ...", continuation lines belong to the previous item
+    parsed, current = {}, None
+    for line in text.splitlines():
+        match = _NUMBERED_LINE.match(line)
+        if match:
+            # An out-of-range number still ends the previous item
+            number = int(match.group(1))
+            current = number if 1 <= number <= count else None
+            if current is not None:
+                parsed[current] = match.group(2).strip()
+        elif current is not None and line.strip():
+            parsed[current] = f"{parsed[current]} {line.strip()}".lstrip()
+    return {
+        number: explanation
+        for number, explanation in parsed.items()
+        if explanation.strip()
+    }
+
+
+def clean_explanation(raw: str) -> str:
+    """Strip quotes, markdown and prefixes from a model response"""
+    explanation = raw.strip()
+
+    # Clean up the response
+    explanation = explanation.replace('"', "").replace("*", "").strip()
+
+    # Remove any "Explanation:" prefix
+    if explanation.lower().startswith("explanation:"):
+        explanation = explanation[12:].strip()
+
+    # Ensure it's not too long
+    if len(explanation) > 250:
+        explanation = explanation[:247] + "..."
+    return explanation
+
+
+def failure_message(error: Exception) -> str:
+    return (
+        f"⚠️ AI explanation failed: {str(error)[:100]}. "
+        "Please check your GEMINI_API_KEY in .env file."
+    )
+
+
+class ExplanationService:
+    """Shared Gemini client with a concurrency cap and per-call timeouts"""
+
+    def __init__(
+        self,
+        enabled: bool,
+        max_concurrency: int = GEMINI_MAX_CONCURRENCY,
+        timeout: float = GEMINI_TIMEOUT,
+        batch_size: int = GEMINI_BATCH_SIZE,
+        batch_wait_ms: float = GEMINI_BATCH_WAIT_MS,
+    ):
+        self.enabled = enabled
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait_ms / 1000
+        self._model = None
+        self._loop = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._batches = set()
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.waiting = 0
+        self.batches = 0
+        self.batched_items = 0
+        self.fallbacks = 0
+
+    @property
+    def model(self):
+        # Created once and reused; it only holds configuration
+        if self._model is None:
+            self._model = genai.GenerativeModel(GEMINI_MODEL)
+        return self._model
+
+    def _bind_loop(self):
+        """(Re)create loop-bound primitives; offline scoring runs one loop per chunk"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._queue = asyncio.Queue()
+            self._worker = None
+
+    async def explain(self, text: str, language: str) -> str:
+        """Explanation for a metaphor, or a ⚠️ message describing why there is none"""
+        if not self.enabled:
+            return UNCONFIGURED_MESSAGE
+
+        self._bind_loop()
+        if self.batch_size <= 1:
+            return await self._explain_one(text, language)
+
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._collect_batches())
+
+        future = self._loop.create_future()
+        await self._queue.put((text, language, future))
+        return await future
+
+    async def _collect_batches(self):
+        """Group queued requests into batches of up to batch_size"""
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.batch_wait
+
+            while len(batch) < self.batch_size:
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Run batches concurrently; the semaphore caps calls in flight
+            task = asyncio.create_task(self._run_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch: list):
+        """Explain a batch with one call; items it doesn't cover get single calls"""
+        results: Dict[int, str] = {}
+        if len(batch) > 1:
+            try:
+                results = await self._explain_many(
+                    [(text, language) for text, language, _ in batch]
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Batched explanation of {len(batch)} metaphors failed, explaining "
+                    f"individually: {str(e)}"
+                )
+
+        missing = [i for i in range(1, len(batch) + 1) if i not in results]
+        if len(batch) > 1:
+            self.fallbacks += len(missing)
+        singles = await asyncio.gather(
+            *(self._explain_one(batch[i - 1][0], batch[i - 1][1]) for i in missing)
+        )
+        results.update(zip(missing, singles))
+
+        for i, (_, _, future) in enumerate(batch, 1):
+            if not future.done():
+                future.set_result(results[i])
+
+    async def _explain_many(self, items: List[Tuple[str, str]]) -> Dict[int, str]:
+        """One Gemini call for several metaphors; returns the parseable explanations"""
+        self.waiting += 1
+        async with self._semaphore:
+            self.waiting -= 1
+            self.calls += 1
+            self.batches += 1
+            response = await asyncio.wait_for(
+                self.model.generate_content_async(
+                    build_batch_prompt(items),
+                    generation_config=genai.types.GenerationConfig(
+                        temperature=0.3,
+                        max_output_tokens=100 * len(items) + 50,
+                    ),
+                ),
+                timeout=self.timeout,
+            )
+
+        parsed = parse_batch_response(response.text if response else "", len(items))
+        self.batched_items += len(parsed)
+        logger.info(
+            f"✅ Generated {len(parsed)}/{len(items)} AI explanations in one call"
+        )
+        return {
+            number: clean_explanation(explanation)
+            for number, explanation in parsed.items()
+        }
+
+    async def _explain_one(self, text: str, language: str) -> str:
+        """One Gemini call for one metaphor"""
+        self.waiting += 1
+        async with self._semaphore:
+            self.waiting -= 1
+            self.calls += 1
+            try:
+                response = await asyncio.wait_for(
+                    self.model.generate_content_async(
+                        build_prompt(text, language),
+                        generation_config=GENERATION_CONFIG,
+                    ),
+                    timeout=self.timeout,
+                )
+                if not (response and response.text):
+                    raise Exception("No response from AI")
+
+                explanation = clean_explanation(response.text)
+                logger.info(f"✅ Generated AI explanation: {explanation}")
+                return explanation
+
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                logger.error(f"❌ AI explanation timed out after {self.timeout}s")
+                return (
+                    f"⚠️ AI explanation timed out after {self.timeout:g}s. "
+                    "Please try again."
+                )
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"❌ Error generating AI explanation: {str(e)}")
+                return failure_message(e)
+
+    def close(self):
+        """Stop collecting batches"""
+        if self._worker:
+            self._worker.cancel()
+            self._worker = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "model": GEMINI_MODEL,
+            "max_concurrency": self.max_concurrency,
+            "timeout_seconds": self.timeout,
+            "batch_size": self.batch_size,
+            "calls": self.calls,
+            "batched_calls": self.batches,
+            "batched_items": self.batched_items,
+            "single_fallbacks": self.fallbacks,
+            "waiting": self.waiting,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+        }
+
+
+class ExplanationJobs:
+    """Background explanation jobs for deferred delivery, keyed by explanation ID"""
+
+    def __init__(self, ttl: int = EXPLANATION_JOB_TTL):
+        self.ttl = ttl
+        self.jobs: Dict[str, dict] = {}
+        self._events: Dict[str, asyncio.Event] = {}
+        self._tasks = set()
+
+    def submit(self, job_id: str, compute: Callable[[], Awaitable[str]]) -> str:
+        """Start computing an explanation unless the same one is already pending"""
+        self._prune()
+        job = self.jobs.get(job_id)
+        if job is not None and job["status"] == "pending":
+            return job_id
+
+        self.jobs[job_id] = {
+            "id": job_id,
+            "status": "pending",
+            "explanation": None,
+            "created": time.time(),
+        }
+        self._events[job_id] = asyncio.Event()
+
+        task = asyncio.create_task(self._run(job_id, compute))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job_id
+
+    async def _run(self, job_id: str, compute: Callable[[], Awaitable[str]]):
+        job = self.jobs[job_id]
+        try:
+            explanation = await compute()
+            job.update(
+                status="failed" if explanation.startswith("⚠️") else "done",
+                explanation=explanation,
+            )
+        except Exception as e:
+            logger.error(f"Deferred explanation {job_id} failed: {str(e)}")
+            job.update(status="failed", explanation=failure_message(e))
+        finally:
+            job["finished"] = time.time()
+            self._events[job_id].set()
+
+    def get(self, job_id: str) -> Optional[dict]:
+        return self.jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[dict]:
+        """The job once finished, or as it stands after timeout seconds"""
+        event = self._events.get(job_id)
+        if event is not None:
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.jobs.get(job_id)
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl
+        for job_id in [
+            j
+            for j, job in self.jobs.items()
+            if job.get("finished", time.time()) < cutoff
+        ]:
+            del self.jobs[job_id]
+            del self._events[job_id]
+
+    def cancel_all(self):
+        for task in list(self._tasks):
+            task.cancel()
+
+    def stats(self) -> dict:
+        pending = sum(1 for job in self.jobs.values() if job["status"] == "pending")
+        return {
+            "mode": EXPLANATION_MODE,
+            "pending": pending,
+            "retained": len(self.jobs),
+        }
@@ -1,73 +1,189 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Request, Query
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, AutoModel
-import torch
-import numpy as np
-from typing import Optional, List
-import logging
-from pathlib import Path
+import asyncio
 import json
-import google.generativeai as genai
+import logging
 import os
-from dotenv import load_dotenv
-from langdetect import detect, LangDetectException
-import hashlib
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import google.generativeai as genai
+import numpy as np
+import torch
+from batching import BatchScheduler, length_buckets
+from cache import SingleFlight, TTLCache, cache_key, canonical_text, run_sweeper
+from cascade import (
+    CASCADE_LAYERS,
+    CASCADE_MODEL_SUFFIX,
+    CASCADE_THRESHOLD,
+    MODEL_CASCADE,
+    cascade,
+)
 from database import (
-    connect_to_mongodb,
+    clear_all_history,
     close_mongodb_connection,
-    save_prediction,
-    get_prediction_history,
-    get_prediction_by_id,
+    connect_to_mongodb,
     delete_prediction,
-    clear_all_history,
-    get_statistics
+    get_popular_predictions,
+    get_prediction_by_id,
+    get_prediction_history,
+    get_statistics,
+    save_prediction,
+)
+from dedup import MODEL_DEDUP, dedup_reports, load_shared_tokenizer, share_weights
+from dotenv import load_dotenv
+from engines import INFERENCE_ENGINE, create_engine
+from executor import (
+    executor_stats,
+    run_blocking,
+    run_inference,
+    shutdown_executors,
+    start_executors,
+)
+from explanations import (
+    EXPLANATION_JOB_TTL,
+    EXPLANATION_MODE,
+    ExplanationJobs,
+    ExplanationService,
 )
+from fastapi import FastAPI, File, HTTPException, Query, Request, UploadFile
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from langdetect import DetectorFactory, LangDetectException, detect
+from model_registry import MODEL_LAZY_LOADING, ModelRegistry
+from persistent_cache import create_persistent_cache
+from phrase_lexicon import PhraseLexicon
+from pydantic import BaseModel
+from quantization import MODEL_QUANTIZATION
+from script_detection import dominant_script, most_common_script, script_counts
+from segmentation import split_sentences
+from token_budget import MAX_INPUT_CHARS, PAD_TO_MULTIPLE_OF, count_tokens, token_budget
+from transformers import AutoTokenizer
+from translation import TranslationClient
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Make langdetect deterministic
+DetectorFactory.seed = 0
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Multilingual Metaphor Detection API")
 
-# Simple in-memory cache for predictions
-prediction_cache = {}
-CACHE_TTL = 3600  # 1 hour
+# Bounded in-memory cache for predictions
+CACHE_TTL = int(os.getenv("CACHE_TTL", "3600"))  # 1 hour
+# Results carrying a Gemini explanation are expensive to recompute, so they live longer;
+# results with a failed/placeholder explanation expire quickly so they get retried
+CACHE_TTL_EXPLAINED = int(os.getenv("CACHE_TTL_EXPLAINED", "86400"))
+CACHE_TTL_DEGRADED = int(os.getenv("CACHE_TTL_DEGRADED", "300"))
+MODEL_BASE_PATH = Path(__file__).parent.parent / "models"
+
+
+def model_fingerprint() -> str:
+    """
+    Identifies the model files and inference settings behind a label
+    Persisted labels are keyed by it, so a retrained model, engine or cascade
+    change starts fresh
+    """
+    parts = [
+        INFERENCE_ENGINE,
+        MODEL_QUANTIZATION,
+        f"{MODEL_CASCADE}:{CASCADE_THRESHOLD}:{CASCADE_LAYERS}:{CASCADE_MODEL_SUFFIX}",
+    ]
+    for path in sorted(MODEL_BASE_PATH.glob("*_model*/*")):
+        if path.name == "config.json" or path.suffix in (".safetensors", ".bin"):
+            stat = path.stat()
+            parts.append(
+                f"{path.parent.name}/{path.name}:{stat.st_size}:{int(stat.st_mtime)}"
+            )
+    return cache_key(*parts)[:12]
+
+
+# Optional on-disk tier shared by all workers and kept across restarts
+# (PERSISTENT_CACHE=true)
+persistent_cache = create_persistent_cache()
+MODEL_FINGERPRINT = model_fingerprint()
+prediction_cache = TTLCache(
+    "prediction",
+    default_ttl=CACHE_TTL,
+    backing=persistent_cache,
+    namespace=f"prediction:{MODEL_FINGERPRINT}",
+)
+
+# Per-stage caches, so a stage is computed once per language and canonical text
+classification_cache = TTLCache(
+    "classification",
+    default_ttl=CACHE_TTL,
+    backing=persistent_cache,
+    namespace=f"classification:{MODEL_FINGERPRINT}",
+)
+translation_cache = TTLCache(
+    "translation", default_ttl=CACHE_TTL_EXPLAINED, backing=persistent_cache
+)
+explanation_cache = TTLCache(
+    "explanation", default_ttl=CACHE_TTL_EXPLAINED, backing=persistent_cache
+)
+cache_sweeper = None
+
+# Concurrent identical /predict requests share one pipeline run
+prediction_flights = SingleFlight()
+
+# Background cache warm-up from prediction history after startup
+CACHE_WARMUP = os.getenv("CACHE_WARMUP", "false").lower() == "true"
+CACHE_WARMUP_SIZE = int(os.getenv("CACHE_WARMUP_SIZE", "1000"))
+CACHE_WARMUP_ORDER = os.getenv("CACHE_WARMUP_ORDER", "frequent")  # frequent | recent
+CACHE_WARMUP_BATCH_SIZE = int(os.getenv("CACHE_WARMUP_BATCH_SIZE", "64"))
+warmup_status = {"state": "disabled" if not CACHE_WARMUP else "pending"}
+warmup_task = None
+
 
 def get_cache_key(text: str) -> str:
-    """Generate cache key for text"""
-    return hashlib.md5(text.encode()).hexdigest()
+    """Generate cache key for the canonical form of text"""
+    return cache_key(canonical_text(text))
+
+
+def stage_cache_key(language: str, text: str) -> str:
+    """Cache key for one pipeline stage's result"""
+    return cache_key(language, canonical_text(text))
+
 
 def get_cached_prediction(text: str) -> Optional[dict]:
     """Get cached prediction if available and not expired"""
-    cache_key = get_cache_key(text)
-    if cache_key in prediction_cache:
-        cached_data = prediction_cache[cache_key]
-        if time.time() - cached_data['timestamp'] < CACHE_TTL:
-            logger.info(f"Cache hit for text: {text[:50]}...")
-            return cached_data['result']
-        else:
-            # Remove expired cache entry
-            del prediction_cache[cache_key]
-    return None
+    result = prediction_cache.get(get_cache_key(text))
+    if result is not None:
+        logger.info(f"Cache hit for text: {text[:50]}...")
+    return result
+
+
+def prediction_ttl(result: dict) -> int:
+    """TTL weighted by what the result cost to produce"""
+    explanation = result.get("explanation")
+    if explanation and explanation.startswith("⚠️"):
+        return CACHE_TTL_DEGRADED
+    if (result.get("translation") or "").startswith("["):
+        return CACHE_TTL_DEGRADED
+    if explanation:
+        return CACHE_TTL_EXPLAINED
+    return CACHE_TTL
+
 
 def cache_prediction(text: str, result: dict):
     """Cache prediction result"""
-    cache_key = get_cache_key(text)
-    prediction_cache[cache_key] = {
-        'result': result,
-        'timestamp': time.time()
-    }
+    prediction_cache.set(get_cache_key(text), result, ttl=prediction_ttl(result))
     logger.info(f"Cached prediction for text: {text[:50]}...")
 
+
 # Configure Gemini API
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 if not GEMINI_API_KEY:
-    logger.warning("GEMINI_API_KEY not found in environment variables. Please set it in .env file.")
+    logger.warning(
+        "GEMINI_API_KEY not found in environment variables. Please set it in .env file."
+    )
     logger.warning("AI explanations will not work without a valid API key.")
 else:
     try:
@@ -78,6 +194,17 @@ else:
         logger.error(f"Failed to configure Gemini API: {str(e)}")
         GEMINI_API_KEY = None
 
+# Shared async Gemini client, and background jobs for deferred explanations
+explanation_service = ExplanationService(enabled=GEMINI_API_KEY is not None)
+explanation_jobs = ExplanationJobs()
+
+# Known metaphor translations, compiled once and reloaded when the files change
+phrase_lexicon = PhraseLexicon()
+phrase_lexicon.load()
+
+# Pooled translation client with per-call deadlines and a circuit breaker
+translation_client = TranslationClient()
+
 # CORS middleware to allow frontend requests
 app.add_middleware(
     CORSMiddleware,
@@ -90,18 +217,44 @@ app.add_middleware(
 # Global variables for models
 models = {}
 tokenizers = {}
-MODEL_BASE_PATH = Path(__file__).parent.parent / "models"
+quantization_reports = {}
+model_load_timings = {}
+startup_load_seconds = None
+
+# Languages are loaded concurrently at startup
+MODEL_LOAD_WORKERS = int(os.getenv("MODEL_LOAD_WORKERS", "4"))
+
+# Maximum number of texts accepted by /predict/batch
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "1000"))
+
+# Streaming endpoint: texts scored concurrently, and longest accepted line
+STREAM_MAX_IN_FLIGHT = int(os.getenv("STREAM_MAX_IN_FLIGHT", "64"))
+STREAM_MAX_LINE_BYTES = int(os.getenv("STREAM_MAX_LINE_BYTES", "65536"))
+
+# Document endpoint: longest accepted document and most sentences scored
+DOCUMENT_MAX_CHARS = int(os.getenv("DOCUMENT_MAX_CHARS", "200000"))
+DOCUMENT_MAX_SENTENCES = int(os.getenv("DOCUMENT_MAX_SENTENCES", "2000"))
+
+# Deadline for /predict from arrival; translation/explanation still running then
+# are cut off (0 = none)
+PREDICTION_DEADLINE = float(os.getenv("PREDICTION_DEADLINE", "20"))
+
+# History writes in flight, kept referenced until they finish
+pending_saves = set()
+
+# Stages still running after their request's deadline, kept referenced until they
+# have filled their caches
+pending_stages = set()
 
 # Language mapping for our supported languages
-LANGUAGE_MAP = {
-    'hi': 'hindi',
-    'ta': 'tamil',
-    'te': 'telugu',
-    'kn': 'kannada'
-}
+LANGUAGE_MAP = {"hi": "hindi", "ta": "tamil", "te": "telugu", "kn": "kannada"}
+
 
 class TextInput(BaseModel):
     text: str
+    language: Optional[str] = None  # skips detection, e.g. "hindi" or "hi"
+    defer_explanation: Optional[bool] = None  # default: EXPLANATION_MODE
+
 
 class PredictionResponse(BaseModel):
     language: str
@@ -110,20 +263,82 @@ class PredictionResponse(BaseModel):
     text: str
     translation: str
     explanation: Optional[str] = None
+    explanation_id: Optional[str] = None  # set when the explanation is deferred
+    partial: bool = False  # true when a stage was cut off by the request deadline
+
+
+class BatchTextInput(BaseModel):
+    texts: List[str]
+    include_translation: bool = False
+    include_explanation: bool = False
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    text: str
+    language: Optional[str] = None
+    label: Optional[str] = None
+    confidence: Optional[float] = None
+    translation: Optional[str] = None
+    explanation: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BatchPredictionResponse(BaseModel):
+    count: int
+    succeeded: int
+    failed: int
+    results: List[BatchItemResult]
+
+
+class DocumentInput(BaseModel):
+    text: str
+    include_translation: bool = False
+    include_explanation: bool = False
+
+
+class DocumentSentenceResult(BatchItemResult):
+    start: int
+    end: int
+
+
+class DocumentSummary(BaseModel):
+    sentence_count: int
+    scored: int
+    failed: int
+    metaphor_count: int
+    metaphor_ratio: float
+    mean_confidence: Optional[float] = None
+    top_metaphors: List[int]
+
+
+class DocumentPredictionResponse(BaseModel):
+    language: str
+    summary: DocumentSummary
+    sentences: List[DocumentSentenceResult]
+
 
 class TranslationRequest(BaseModel):
     text: str
     source_language: str
 
+
 class TranslationResponse(BaseModel):
     original_text: str
     translated_text: str
     source_language: str
 
+
 def detect_language(text: str) -> str:
     """
-    Detect language using langdetect library
+    Detect language from its script in one pass over the codepoints
+    langdetect is only consulted for Latin or mixed-script text
     """
+    counts = script_counts(text)
+    language = dominant_script(counts)
+    if language:
+        return language
+
     try:
         # Use langdetect to detect language
         detected_lang = detect(text)
@@ -133,276 +348,444 @@ def detect_language(text: str) -> str:
         if detected_lang in LANGUAGE_MAP:
             return LANGUAGE_MAP[detected_lang]
 
-        # Fallback to character-based detection for Indic languages
-        # Check for Devanagari script (Hindi)
-        if any('\u0900' <= char <= '\u097F' for char in text):
-            return 'hindi'
-
-        # Check for Tamil script
-        if any('\u0B80' <= char <= '\u0BFF' for char in text):
-            return 'tamil'
-
-        # Check for Telugu script
-        if any('\u0C00' <= char <= '\u0C7F' for char in text):
-            return 'telugu'
-
-        # Check for Kannada script
-        if any('\u0C80' <= char <= '\u0CFF' for char in text):
-            return 'kannada'
+        # Fallback to the most frequent Indic script
+        language = most_common_script(counts)
+        if language:
+            return language
 
         # Default fallback
-        logger.warning(f"Unsupported language detected: {detected_lang}, defaulting to hindi")
-        return 'hindi'
+        logger.warning(
+            f"Unsupported language detected: {detected_lang}, defaulting to hindi"
+        )
+        return "hindi"
 
     except LangDetectException as e:
         logger.error(f"Language detection failed: {str(e)}")
 
-        # Fallback to character-based detection
-        if any('\u0900' <= char <= '\u097F' for char in text):
-            return 'hindi'
-        elif any('\u0B80' <= char <= '\u0BFF' for char in text):
-            return 'tamil'
-        elif any('\u0C00' <= char <= '\u0C7F' for char in text):
-            return 'telugu'
-        elif any('\u0C80' <= char <= '\u0CFF' for char in text):
-            return 'kannada'
-        else:
-            logger.warning("Could not detect language, defaulting to hindi")
-            return 'hindi'
-    
-def generate_metaphor_explanation(text: str, language: str, confidence: float) -> str:
+        # Fallback to the most frequent Indic script
+        language = most_common_script(counts)
+        if language:
+            return language
+
+        logger.warning("Could not detect language, defaulting to hindi")
+        return "hindi"
+
+
+def resolve_language_hint(hint: str) -> str:
+    """Map a client-supplied language name or ISO code to a supported language"""
+    language = LANGUAGE_MAP.get(hint.strip().lower(), hint.strip().lower())
+    if language not in LANGUAGES:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Unsupported language: {hint}. "
+                f"Supported languages: {', '.join(LANGUAGES)}"
+            ),
+        )
+    return language
+
+
+def lexicon_translation(text: str, source_language: str) -> Optional[str]:
+    """Translation of the longest known metaphorical phrase in text, if any"""
+    match = phrase_lexicon.lookup(source_language, text)
+    if match:
+        logger.info(f"Using manual metaphor translation: {match[1]}")
+        return match[1]
+    return None
+
+
+def translate_text(text: str, source_language: str) -> str:
     """
-    Generate contextual explanation for detected metaphors using Gemini AI
+    Translate text from source language to English with metaphor context
+    Returns translated text or fallback message
+    Blocking; request handlers use translate_text_async instead
     """
-    # Check if Gemini API is configured
-    if not GEMINI_API_KEY:
-        logger.error("Gemini API key not configured")
-        return "⚠️ AI explanation unavailable - please configure GEMINI_API_KEY in .env file"
-
     try:
-        # Create the Gemini model
-        model = genai.GenerativeModel('gemini-2.0-flash-lite')
+        logger.info(f"Translation request for {source_language}: {text}")
+        return lexicon_translation(
+            text, source_language
+        ) or translation_client.translate_sync(text, source_language)
+    except Exception as e:
+        logger.error(f"Translation error: {str(e)}")
+        return f"[Translation failed: {str(e)}]"
 
-        # Enhanced prompt for accurate metaphor explanations
-        prompt = f"""Analyze this {language} metaphor and explain it in simple English.
 
-TEXT: "{text}"
+async def translate_text_async(text: str, source_language: str) -> str:
+    """Translate with the shared async client; known metaphors come from the lexicon"""
+    try:
+        logger.info(f"Translation request for {source_language}: {text}")
+        return lexicon_translation(
+            text, source_language
+        ) or await translation_client.translate(text, source_language)
+    except Exception as e:
+        logger.error(f"Translation error: {str(e)}")
+        return f"[Translation failed: {str(e)}]"
+
 
-Provide a clear explanation that:
-1. Identifies what is being compared to what
-2. Explains the deeper meaning or message
-3. Is 1-2 sentences maximum
-4. Starts with "This metaphor..." or "It compares..."
+def classify_texts(language: str, texts: List[str]) -> List[Tuple[str, float]]:
+    """
+    Classify a batch of texts with one padded forward pass
+    Returns (label, confidence) for each text in input order
+    """
+    tokenizer = tokenizers[language]
+    max_length = token_budget.truncation_length(language, tokenizer)
 
-Example for "Life is a journey":
-"This metaphor compares life to a journey, suggesting that life is about the experiences and growth along the way, not just reaching the end goal."
+    def predict(model, batch: List[str]) -> np.ndarray:
+        return inference_engine.predict_proba(
+            model,
+            tokenizer,
+            batch,
+            max_length=max_length,
+            pad_to_multiple_of=PAD_TO_MULTIPLE_OF or None,
+        )
 
-Your explanation (keep it concise and specific to this text):"""
+    # Goes straight to the full model unless a cascade first stage is loaded
+    probabilities = cascade.run(language, models[language], texts, predict)
+    predicted_classes = probabilities.argmax(axis=1)
+    confidences = probabilities.max(axis=1)
 
-        # Generate the explanation with safety settings
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.types.GenerationConfig(
-                temperature=0.3,  # Lower temperature for more focused responses
-                max_output_tokens=100,
-            )
+    return [
+        ("metaphor" if predicted_class == 1 else "normal", confidence)
+        for predicted_class, confidence in zip(
+            predicted_classes.tolist(), confidences.tolist()
         )
+    ]
 
-        if response and response.text:
-            explanation = response.text.strip()
 
-            # Clean up the response
-            explanation = explanation.replace('"', '').replace('*', '').strip()
-            
-            # Remove any "Explanation:" prefix
-            if explanation.lower().startswith('explanation:'):
-                explanation = explanation[12:].strip()
+# Active inference engine (INFERENCE_ENGINE=pytorch|onnx)
+inference_engine = create_engine()
 
-            # Ensure it's not too long
-            if len(explanation) > 250:
-                explanation = explanation[:247] + "..."
+# Micro-batching scheduler feeding classify_texts
+batch_scheduler = BatchScheduler(classify_texts)
+
+LANGUAGES = ["hindi", "tamil", "telugu", "kannada"]
+
+
+def available_languages() -> List[str]:
+    """Languages with a model directory on disk"""
+    return [lang for lang in LANGUAGES if (MODEL_BASE_PATH / f"{lang}_model").exists()]
 
-            logger.info(f"✅ Generated AI explanation: {explanation}")
-            return explanation
-        else:
-            raise Exception("No response from AI")
 
+def load_tokenizer(lang: str, model_path: Path):
+    """Load a tokenizer with fallback to the slow tokenizer"""
+    try:
+        tokenizer = AutoTokenizer.from_pretrained(str(model_path), use_fast=True)
+        logger.info(f"✓ Loaded fast tokenizer for {lang}")
     except Exception as e:
-        logger.error(f"❌ Error generating AI explanation: {str(e)}")
-        logger.error(f"Error type: {type(e).__name__}")
-        
-        # Return error message so user knows to check API key
-        return f"⚠️ AI explanation failed: {str(e)[:100]}. Please check your GEMINI_API_KEY in .env file."
+        logger.warning(f"Fast tokenizer failed for {lang}, trying slow tokenizer")
+        tokenizer = AutoTokenizer.from_pretrained(str(model_path), use_fast=False)
+        logger.info(f"✓ Loaded slow tokenizer for {lang}")
+    return tokenizer
+
+
+def load_language(lang: str) -> bool:
+    """Load the tokenizer and model for one language into the shared dicts"""
+    model_path = MODEL_BASE_PATH / f"{lang}_model"
+
+    if not model_path.exists():
+        logger.warning(f"Model path not found: {model_path}")
+        return False
+
+    logger.info(f"Loading {lang} model from {model_path}")
+    timings = {}
+    load_started = time.perf_counter()
 
-def translate_text(text: str, source_language: str) -> str:
-    """
-    Translate text from source language to English with metaphor context
-    Returns translated text or fallback message
-    """
     try:
-        logger.info(f"Translation request for {source_language}: {text}")
-        
-        # Manual translations for common metaphorical expressions
-        metaphor_translations = {
-            'hindi': {
-                'दुख की चादर ने उसे ढक लिया था': 'The blanket of sorrow had covered him/her',
-                'खुशी का सूरज निकला': 'The sun of happiness rose',
-                'गुस्से की आग भड़की': 'The fire of anger flared up',
-                'उम्मीद का दीया जला': 'The lamp of hope was lit',
-                'प्रेम की नदी बह रही है': 'The river of love is flowing'
-            },
-            'tamil': {
-                'துக்கத்தின் கடல்': 'Ocean of sorrow',
-                'மகிழ்ச்சியின் சூரியன்': 'Sun of happiness',
-                'கோபத்தின் நெருப்பு': 'Fire of anger'
-            },
-            'kannada': {
-                'ದುಃಖದ ಸಮುದ್ರ': 'Ocean of sorrow',
-                'ಸಂತೋಷದ ಸೂರ್ಯ': 'Sun of happiness',
-                'ಕೋಪದ ಬೆಂಕಿ': 'Fire of anger'
-            }
-        }
-        
-        # Check for manual translations first
-        if source_language in metaphor_translations:
-            for original, translation in metaphor_translations[source_language].items():
-                if original in text:
-                    logger.info(f"Using manual metaphor translation: {translation}")
-                    return translation
-        
-        # Try to use googletrans if available
-        try:
-            from googletrans import Translator
-            translator = Translator()
-            
-            # Map language codes
-            lang_map = {
-                'hindi': 'hi',
-                'tamil': 'ta',
-                'kannada': 'kn',
-                'telugu': 'te'
-            }
-            
-            source_lang = lang_map.get(source_language, 'auto')
-            result = translator.translate(text, src=source_lang, dest='en')
-            translated_text = result.text
-            
-            logger.info(f"Translation successful: {translated_text}")
-            return translated_text
-            
-        except ImportError:
-            # Fallback if googletrans not installed
-            logger.warning("googletrans not installed, using placeholder")
-            return f"[Translation of '{text}' from {source_language} to English. Install 'googletrans==4.0.0-rc1' for automatic translation.]"
-        except Exception as trans_error:
-            # Fallback if translation fails
-            logger.error(f"Translation error: {str(trans_error)}")
-            return f"[Translation temporarily unavailable. Original text: '{text}']"
-            
+        # Load tokenizer (shared with any language that has identical vocab files)
+        phase_started = time.perf_counter()
+        tokenizer, tokenizer_shared_with = load_shared_tokenizer(
+            lang, model_path, lambda: load_tokenizer(lang, model_path)
+        )
+        timings["tokenizer"] = round(time.perf_counter() - phase_started, 3)
+
+        # Load model through the active engine
+        model, report = inference_engine.load_model(
+            lang, model_path, tokenizer, timings
+        )
+        if report:
+            quantization_reports[lang] = report
+
+        # Share tensors identical to ones other languages already hold
+        phase_started = time.perf_counter()
+        dedup_reports[lang] = share_weights(lang, model)
+        dedup_reports[lang]["tokenizer_shared_with"] = tokenizer_shared_with
+        timings["dedup"] = round(time.perf_counter() - phase_started, 3)
+
+        # Cheap first-stage scorer for the confidence cascade
+        if MODEL_CASCADE:
+            phase_started = time.perf_counter()
+            cascade.prepare(
+                lang,
+                model,
+                MODEL_BASE_PATH / f"{lang}{CASCADE_MODEL_SUFFIX}",
+                lambda path: inference_engine.load_model(lang, path, tokenizer)[0],
+            )
+            timings["cascade"] = round(time.perf_counter() - phase_started, 3)
+
+        timings["total"] = round(time.perf_counter() - load_started, 3)
+        model_load_timings[lang] = timings
+        logger.info(f"✓ {lang} load timings (s): {timings}")
+
+        # Publish tokenizer and model together so inference never sees half a language
+        tokenizers[lang] = tokenizer
+        models[lang] = model
+        return True
+
     except Exception as e:
-        logger.error(f"Translation error: {str(e)}")
-        return f"[Translation failed: {str(e)}]"
+        logger.error(f"✗ Failed to load {lang} model: {str(e)}")
+        return False
+
 
 def load_models():
-    """Load all language models at startup"""
-    languages = ['hindi', 'tamil', 'telugu', 'kannada']
+    """Load all language models at startup, in parallel"""
+    global startup_load_seconds
     loaded_count = 0
-    
-    for lang in languages:
-        model_path = MODEL_BASE_PATH / f"{lang}_model"
-        
-        if not model_path.exists():
-            logger.warning(f"Model path not found: {model_path}")
-            continue
-        
-        logger.info(f"Loading {lang} model from {model_path}")
-        
-        try:
-            # Load tokenizer with fallback to slow tokenizer
-            try:
-                tokenizers[lang] = AutoTokenizer.from_pretrained(
-                    str(model_path),
-                    use_fast=True
-                )
-                logger.info(f"✓ Loaded fast tokenizer for {lang}")
-            except Exception as e:
-                logger.warning(f"Fast tokenizer failed for {lang}, trying slow tokenizer")
-                tokenizers[lang] = AutoTokenizer.from_pretrained(
-                    str(model_path),
-                    use_fast=False
-                )
-                logger.info(f"✓ Loaded slow tokenizer for {lang}")
-            
-            # Load model
-            models[lang] = AutoModelForSequenceClassification.from_pretrained(
-                str(model_path),
-                num_labels=2
-            )
-            models[lang].eval()
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(
+        max_workers=MODEL_LOAD_WORKERS, thread_name_prefix="model-load"
+    ) as pool:
+        futures = {pool.submit(load_language, lang): lang for lang in LANGUAGES}
+
+        for future in as_completed(futures):
+            lang = futures[future]
+            if not future.result():
+                logger.error("  Continuing with other models...")
+                continue
+
             loaded_count += 1
-            
-            logger.info(f"✓ Successfully loaded {lang} model ({loaded_count}/{len(languages)})")
-            
-        except Exception as e:
-            logger.error(f"✗ Failed to load {lang} model: {str(e)}")
-            logger.error(f"  Continuing with other models...")
-            continue
-    
+            logger.info(
+                f"✓ Successfully loaded {lang} model ({loaded_count}/{len(LANGUAGES)})"
+            )
+
+    startup_load_seconds = round(time.perf_counter() - started, 3)
+
     if loaded_count == 0:
         raise RuntimeError("No models could be loaded. Please check model files.")
-    
+
     logger.info(f"\n{'='*60}")
-    logger.info(f"✓ Model loading complete: {loaded_count}/{len(languages)} models loaded")
+    logger.info(
+        f"✓ Model loading complete: {loaded_count}/{len(LANGUAGES)} models loaded in "
+        f"{startup_load_seconds}s"
+    )
     logger.info(f"  Available languages: {', '.join(models.keys())}")
     logger.info(f"{'='*60}\n")
 
+
+def resident_model_size_mb(lang: str) -> float:
+    """Resident size of a loaded language model in MB"""
+    try:
+        return inference_engine.model_info(models[lang])["model_size_mb"]
+    except Exception:
+        return 0.0
+
+
+# Lazy loading and LRU eviction over the models/tokenizers dicts
+model_registry = ModelRegistry(
+    models, tokenizers, load_language, resident_model_size_mb
+)
+
+
+async def warm_cache():
+    """
+    Preload the caches with the most requested texts from history
+    Stored results still within their TTL and produced by the current model
+    (same MODEL_FINGERPRINT) are restored as-is. Others keep their stored
+    translation and explanation, and are re-classified in batches.
+    """
+    started = time.perf_counter()
+    warmup_status.update(
+        state="loading_history", total=0, restored=0, rescored=0, failed=0
+    )
+
+    try:
+        entries = await get_popular_predictions(CACHE_WARMUP_SIZE, CACHE_WARMUP_ORDER)
+        warmup_status.update(state="running", total=len(entries))
+        logger.info(
+            f"Cache warm-up: {len(entries)} texts from history ({CACHE_WARMUP_ORDER})"
+        )
+
+        now = datetime.utcnow()
+        stale = {}
+        for entry in entries:
+            text, language = entry.get("text"), entry.get("language")
+            if not text or language not in LANGUAGES or entry.get("label") is None:
+                warmup_status["failed"] += 1
+                continue
+
+            result = {
+                "language": language,
+                "label": entry["label"],
+                "confidence": entry["confidence"],
+                "text": text,
+                "translation": entry.get("translation") or "",
+                "explanation": entry.get("explanation"),
+            }
+
+            # Stage results that don't depend on the model can always be reused
+            key = stage_cache_key(language, text)
+            if result["translation"] and not result["translation"].startswith("["):
+                translation_cache.set(key, result["translation"])
+            if result["explanation"] and not result["explanation"].startswith("⚠️"):
+                explanation_cache.set(key, result["explanation"])
+
+            # Labels from another model (or rows saved before fingerprints were stored)
+            # are re-scored
+            remaining = (
+                prediction_ttl(result) - (now - entry["last_seen"]).total_seconds()
+            )
+            if remaining > 0 and entry.get("model_fingerprint") == MODEL_FINGERPRINT:
+                prediction_cache.set(get_cache_key(text), result, ttl=remaining)
+                classification_cache.set(
+                    key, (result["label"], result["confidence"]), ttl=remaining
+                )
+                warmup_status["restored"] += 1
+            else:
+                stale.setdefault(language, []).append(result)
+
+        # Re-classify expired entries in batches, yielding to live traffic in between
+        for language, results in stale.items():
+            if not await model_registry.ensure_loaded(language):
+                warmup_status["failed"] += len(results)
+                continue
+
+            for i in range(0, len(results), CACHE_WARMUP_BATCH_SIZE):
+                chunk = results[i : i + CACHE_WARMUP_BATCH_SIZE]
+                items = [
+                    BatchItemResult(index=j, text=result["text"])
+                    for j, result in enumerate(chunk)
+                ]
+                with model_registry.pinned(language):
+                    await score_language_group(language, items)
+
+                for item, result in zip(items, chunk):
+                    if item.label is None:
+                        warmup_status["failed"] += 1
+                        continue
+                    warmup_status["rescored"] += 1
+                    # A full response needs an explanation if the text is a metaphor
+                    if item.label == "metaphor" and not result["explanation"]:
+                        continue
+                    rescored = {
+                        **result,
+                        "label": item.label,
+                        "confidence": item.confidence,
+                    }
+                    if item.label != "metaphor":
+                        # Normal results carry no explanation, even if it used to be
+                        # a metaphor
+                        rescored["explanation"] = None
+                    cache_prediction(item.text, rescored)
+
+                await asyncio.sleep(0)
+
+        warmup_status["state"] = "done"
+    except Exception as e:
+        logger.error(f"✗ Cache warm-up failed: {str(e)}")
+        warmup_status.update(state="failed", error=str(e))
+
+    warmup_status["seconds"] = round(time.perf_counter() - started, 2)
+    logger.info(f"✓ Cache warm-up {warmup_status['state']}: {warmup_status}")
+
+
 @app.on_event("startup")
 async def startup_event():
     """
     Load models and connect to database when the application starts
     """
-    logger.info("\n" + "="*60)
+    global cache_sweeper, warmup_task
+
+    logger.info("\n" + "=" * 60)
     logger.info("Starting Multilingual Metaphor Detection API")
-    logger.info("="*60 + "\n")
-    
-    try:
-        load_models()
-        logger.info("✓ Models loaded successfully\n")
-    except Exception as e:
-        logger.error(f"✗ Model loading failed: {str(e)}")
-        logger.error("Please check that all model files are present in the models/ directory")
-    
+    logger.info("=" * 60 + "\n")
+
+    model_registry.set_available(available_languages())
+
+    if models:
+        # Pre-fork serving (serve.py) loads models once in the parent process
+        logger.info(
+            f"✓ Using models preloaded by parent process: {', '.join(models.keys())}\n"
+        )
+        model_registry.register_loaded()
+    elif MODEL_LAZY_LOADING:
+        logger.info(
+            "Lazy model loading enabled, models load on first use: "
+            f"{', '.join(model_registry.available)}\n"
+        )
+    else:
+        try:
+            load_models()
+            logger.info("✓ Models loaded successfully\n")
+        except Exception as e:
+            logger.error(f"✗ Model loading failed: {str(e)}")
+            logger.error(
+                "Please check that all model files are present in the models/ directory"
+            )
+        model_registry.register_loaded()
+
+    # Inference and blocking I/O run off the event loop
+    start_executors()
+
+    # Periodically drop expired cache entries
+    cache_sweeper = asyncio.create_task(
+        run_sweeper(
+            prediction_cache,
+            classification_cache,
+            translation_cache,
+            explanation_cache,
+            *([persistent_cache] if persistent_cache else []),
+        )
+    )
+
     # Connect to MongoDB
     try:
         await connect_to_mongodb()
     except Exception as e:
         logger.error(f"✗ MongoDB connection failed: {str(e)}")
         logger.warning("History feature will be disabled")
-    
+
+    # Warm the caches in the background; the server is ready meanwhile
+    if CACHE_WARMUP:
+        warmup_task = asyncio.create_task(warm_cache())
+
     logger.info("✓ Application startup complete\n")
 
+
 @app.on_event("shutdown")
 async def shutdown_event():
     """
     Close database connection on shutdown
     """
     logger.info("Shutting down application...")
+    if cache_sweeper:
+        cache_sweeper.cancel()
+    if warmup_task:
+        warmup_task.cancel()
+    explanation_jobs.cancel_all()
+    explanation_service.close()
+    await translation_client.close()
+    for task in list(pending_stages):
+        task.cancel()
+    if pending_saves:
+        await asyncio.wait(pending_saves, timeout=5)
+    await batch_scheduler.close()
+    shutdown_executors()
     await close_mongodb_connection()
     logger.info("✓ Application shutdown complete")
 
+
 @app.get("/health")
 async def health_check():
     """
     Health check endpoint with detailed system information
     """
     import psutil
-    import torch
-    
+
     try:
         # System metrics
-        cpu_percent = psutil.cpu_percent(interval=1)
+        cpu_percent = await run_blocking(psutil.cpu_percent, interval=1)
         memory = psutil.virtual_memory()
-        
+
         # GPU info if available
         gpu_info = {}
         if torch.cuda.is_available():
@@ -410,11 +793,11 @@ async def health_check():
                 "gpu_available": True,
                 "gpu_count": torch.cuda.device_count(),
                 "gpu_memory_allocated": torch.cuda.memory_allocated() / 1024**3,  # GB
-                "gpu_memory_reserved": torch.cuda.memory_reserved() / 1024**3,   # GB
+                "gpu_memory_reserved": torch.cuda.memory_reserved() / 1024**3,  # GB
             }
         else:
             gpu_info = {"gpu_available": False}
-        
+
         return {
             "status": "System is running",
             "models_loaded": list(models.keys()),
@@ -422,19 +805,270 @@ async def health_check():
                 "cpu_usage_percent": cpu_percent,
                 "memory_usage_percent": memory.percent,
                 "memory_available_gb": memory.available / 1024**3,
-                "memory_total_gb": memory.total / 1024**3
+                "memory_total_gb": memory.total / 1024**3,
             },
             "gpu_info": gpu_info,
-            "gemini_api_configured": GEMINI_API_KEY is not None
+            "model_registry": model_registry.stats(),
+            "batching": batch_scheduler.stats(),
+            "executors": executor_stats(),
+            "cache": prediction_cache.stats(),
+            "cache_warmup": warmup_status,
+            "explanations": {**explanation_service.stats(), **explanation_jobs.stats()},
+            "phrase_lexicon": phrase_lexicon.stats(),
+            "translation": translation_client.stats(),
+            "gemini_api_configured": GEMINI_API_KEY is not None,
         }
     except Exception as e:
         logger.error(f"Health check error: {str(e)}")
         return {
             "status": "System is running with limited monitoring",
             "models_loaded": list(models.keys()),
-            "error": str(e)
+            "error": str(e),
         }
 
+
+async def token_budget_error(language: str, text: str) -> Optional[str]:
+    """Record the text's token count; return an error message if it is over budget"""
+    # Tokenizing shares the tokenizer lock with inference, so keep it off the event loop
+    token_count = (await run_inference(count_tokens, tokenizers[language], [text]))[0]
+    token_budget.record(language, [token_count])
+    token_limit = token_budget.max_length(language, tokenizers[language])
+
+    if token_count > token_limit:
+        token_budget.record_rejection(language)
+        return (
+            f"Text too long: {token_count} tokens exceeds the "
+            f"{token_limit}-token limit for {language}."
+        )
+    return None
+
+
+async def classify_cached(language: str, text: str) -> Tuple[str, float]:
+    """Classify through the per-language batch queue, reusing cached labels"""
+    key = stage_cache_key(language, text)
+    cached = classification_cache.get(key)
+    if cached is not None:
+        return cached
+
+    label, confidence = await batch_scheduler.submit(language, text)
+    classification_cache.set(key, (label, confidence))
+    return label, confidence
+
+
+async def translate_cached(text: str, language: str, use_lexicon: bool = True) -> str:
+    """
+    Translate with the shared client, reusing cached translations
+    With use_lexicon=False known metaphors are machine-translated like any other text
+    """
+    key = (
+        stage_cache_key(language, text)
+        if use_lexicon
+        else cache_key("machine", language, canonical_text(text))
+    )
+    cached = translation_cache.get(key)
+    if cached is not None:
+        return cached
+
+    if use_lexicon:
+        translation = await translate_text_async(text, language)
+    else:
+        translation = await translation_client.translate(text, language)
+    # Placeholder translations are kept briefly so the service is retried soon
+    translation_cache.set(
+        key,
+        translation,
+        ttl=CACHE_TTL_DEGRADED if translation.startswith("[") else None,
+    )
+    return translation
+
+
+async def translate_concurrently(pairs: List[Tuple[str, str]]) -> List[str]:
+    """Translate (text, language) pairs concurrently, one per pooled connection"""
+    semaphore = asyncio.Semaphore(translation_client.max_connections)
+
+    async def translate_one(text: str, language: str) -> str:
+        async with semaphore:
+            return await translate_cached(text, language)
+
+    return await asyncio.gather(
+        *(translate_one(text, language) for text, language in pairs)
+    )
+
+
+async def explain_cached(text: str, language: str, confidence: float) -> str:
+    """Generate a Gemini explanation, reusing cached ones"""
+    key = stage_cache_key(language, text)
+    cached = explanation_cache.get(key)
+    if cached is not None:
+        return cached
+
+    explanation = await explanation_service.explain(text, language)
+    explanation_cache.set(
+        key,
+        explanation,
+        ttl=CACHE_TTL_DEGRADED if explanation.startswith("⚠️") else None,
+    )
+    return explanation
+
+
+async def save_history(result_data: dict):
+    try:
+        await save_prediction(result_data)
+    except Exception as db_error:
+        logger.warning(f"Failed to save to database: {str(db_error)}")
+        # Don't fail the request if database save fails
+
+
+def store_prediction(text: str, result_data: dict):
+    """Cache a finished prediction and save it to history in the background"""
+    cache_prediction(text, result_data)
+
+    # The fingerprint tells cache warm-up whether the current model produced the label
+    task = asyncio.create_task(
+        save_history({**result_data, "model_fingerprint": MODEL_FINGERPRINT})
+    )
+    pending_saves.add(task)
+    task.add_done_callback(pending_saves.discard)
+
+
+async def complete_deferred_prediction(result_data: dict) -> str:
+    """Generate a deferred explanation, then cache and store the full result"""
+    explanation = await explain_cached(
+        result_data["text"], result_data["language"], result_data["confidence"]
+    )
+    store_prediction(result_data["text"], {**result_data, "explanation": explanation})
+    return explanation
+
+
+def finish_stage(task: asyncio.Task):
+    pending_stages.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"✗ Background stage failed: {str(task.exception())}")
+
+
+async def run_stages(stages: dict, deadline: Optional[float]) -> Tuple[dict, List[str]]:
+    """
+    Run independent stages concurrently until they finish or the deadline passes
+    Returns the finished stages' results and the names of those cut off. Stages
+    cut off keep running in the background so their results still reach the
+    caches, and neither the deadline nor a client disconnect cancels them.
+    """
+    tasks = {name: asyncio.ensure_future(stage) for name, stage in stages.items()}
+    if not tasks:
+        return {}, []
+    for task in tasks.values():
+        pending_stages.add(task)
+        task.add_done_callback(finish_stage)
+
+    # asyncio.wait only stops waiting; it never cancels the tasks
+    timeout = (
+        None
+        if deadline is None
+        else max(deadline - asyncio.get_running_loop().time(), 0)
+    )
+    done, _ = await asyncio.wait(tasks.values(), timeout=timeout)
+
+    results = {name: task.result() for name, task in tasks.items() if task in done}
+    return results, [name for name, task in tasks.items() if task not in done]
+
+
+async def run_prediction(
+    text: str,
+    language_hint: Optional[str],
+    defer_explanation: bool = False,
+    deadline: Optional[float] = None,
+) -> dict:
+    """Detect, classify, translate and explain one text, then cache and store it"""
+    # Detect language unless the client told us
+    if language_hint:
+        language = language_hint
+    else:
+        language = detect_language(text)
+        logger.info(f"Detected language: {language}")
+
+    # Make sure the model is resident (loads it on first use in lazy mode)
+    if not await model_registry.ensure_loaded(language):
+        available_models = model_registry.available or list(models.keys())
+        raise HTTPException(
+            status_code=500,
+            detail=(
+                f"Model for {language} is not available. "
+                f"Supported languages: {', '.join(available_models)}"
+            ),
+        )
+
+    with model_registry.pinned(language):
+        # Reject over-long inputs by token count before inference
+        budget_error = await token_budget_error(language, text)
+        if budget_error:
+            raise HTTPException(status_code=400, detail=budget_error)
+
+        # Classify through the per-language batch queue
+        label, confidence = await classify_cached(language, text)
+
+    logger.info(f"Prediction: {label} (confidence: {confidence:.4f})")
+
+    # Translation and explanation (for metaphors) are independent, so they run side
+    # by side. Only these stages are bounded by the deadline: classification always
+    # completes, since a response without a label is no answer at all
+    stages = {"translation": translate_cached(text, language)}
+    explanation_key = stage_cache_key(language, text)
+    deferred = (
+        label == "metaphor"
+        and defer_explanation
+        and explanation_cache.get(explanation_key) is None
+    )
+    if label == "metaphor" and not deferred:
+        stages["explanation"] = explain_cached(text, language, confidence)
+
+    results, cut_off = await run_stages(stages, deadline)
+
+    result_data = {
+        "language": language,
+        "label": label,
+        "confidence": round(confidence, 4),
+        "text": text,
+        "translation": results.get(
+            "translation",
+            "[Translation not ready within the request deadline. Original text: "
+            f"'{text}']",
+        ),
+        "explanation": None,
+    }
+    if "explanation" in stages:
+        result_data["explanation"] = results.get(
+            "explanation",
+            "⚠️ AI explanation not ready within the request deadline. "
+            "Please try again.",
+        )
+
+    if deferred and cut_off:
+        # The translation is a placeholder, so only the explanation is produced
+        # (and cached)
+        result_data["explanation_id"] = explanation_jobs.submit(
+            explanation_key, lambda: explain_cached(text, language, confidence)
+        )
+    elif deferred:
+        # Respond now; the explanation is generated, cached and stored in the background
+        pending_result = dict(result_data)
+        result_data["explanation_id"] = explanation_jobs.submit(
+            explanation_key, lambda: complete_deferred_prediction(pending_result)
+        )
+
+    if cut_off:
+        # Neither this result nor its placeholders are cached or stored; the stages
+        # cut off finish in the background, so the next request finds them cached
+        logger.warning(
+            f"⚠️ Request deadline reached; partial result without {', '.join(cut_off)}"
+        )
+        return {**result_data, "partial": True}
+
+    if not deferred:
+        store_prediction(text, result_data)
+
+    return result_data
+
+
 @app.post("/predict", response_model=PredictionResponse)
 async def predict(input_data: TextInput):
     """
@@ -442,139 +1076,610 @@ async def predict(input_data: TextInput):
     """
     try:
         text = input_data.text.strip()
-        
+
         if not text:
             raise HTTPException(status_code=400, detail="Input text cannot be empty")
-        
-        # Check text length
-        if len(text) > 1000:
-            raise HTTPException(status_code=400, detail="Text too long. Please limit to 1000 characters.")
-        
+
+        # Cheap character guard; the real limit is the token budget below
+        if len(text) > MAX_INPUT_CHARS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Text too long. Please limit to {MAX_INPUT_CHARS} characters.",
+            )
+
+        language_hint = (
+            resolve_language_hint(input_data.language) if input_data.language else None
+        )
+
         # Check cache first
         cached_result = get_cached_prediction(text)
-        if cached_result:
-            return PredictionResponse(**cached_result)
-        
-        # Detect language
+        if cached_result and language_hint in (None, cached_result["language"]):
+            return PredictionResponse(**{**cached_result, "text": text})
+
+        defer_explanation = input_data.defer_explanation
+        if defer_explanation is None:
+            defer_explanation = EXPLANATION_MODE == "deferred"
+
+        # Identical requests already in flight share one computation
+        flight_key = cache_key(
+            get_cache_key(text),
+            language_hint or "",
+            "deferred" if defer_explanation else "",
+        )
+        deadline = (
+            asyncio.get_running_loop().time() + PREDICTION_DEADLINE
+            if PREDICTION_DEADLINE
+            else None
+        )
+        result_data = await prediction_flights.do(
+            flight_key,
+            lambda: run_prediction(text, language_hint, defer_explanation, deadline),
+        )
+
+        return PredictionResponse(**{**result_data, "text": text})
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Prediction error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+
+
+def explanation_status(explanation_id: str) -> Optional[dict]:
+    """
+    A deferred explanation from this worker's jobs or, once finished, the shared cache
+    A well-formed ID found in neither is "unknown": it may be pending on another worker
+    """
+    job = explanation_jobs.get(explanation_id)
+    if job is not None:
+        return {
+            "id": explanation_id,
+            "status": job["status"],
+            "explanation": job["explanation"],
+        }
+
+    explanation = explanation_cache.get(explanation_id)
+    if explanation is not None:
+        status = "failed" if explanation.startswith("⚠️") else "done"
+        return {"id": explanation_id, "status": status, "explanation": explanation}
+
+    # IDs are cache keys (md5 hex digests)
+    if len(explanation_id) == 32 and all(
+        c in "0123456789abcdef" for c in explanation_id
+    ):
+        return {"id": explanation_id, "status": "unknown", "explanation": None}
+    return None
+
+
+async def wait_for_explanation(explanation_id: str, timeout: float) -> Optional[dict]:
+    """
+    The explanation's status once it is finished or timeout seconds have passed
+    Jobs held by another worker are polled in the shared cache
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        if explanation_jobs.get(explanation_id) is not None:
+            await explanation_jobs.wait(explanation_id, max(deadline - loop.time(), 0))
+
+        status = explanation_status(explanation_id)
+        remaining = deadline - loop.time()
+        if (
+            status is None
+            or status["status"] not in ("pending", "unknown")
+            or remaining <= 0
+        ):
+            return status
+        if status["status"] == "unknown":
+            await asyncio.sleep(min(0.5, remaining))
+
+
+@app.get("/explanations/{explanation_id}")
+async def get_explanation(explanation_id: str, wait: float = Query(0, ge=0, le=30)):
+    """
+    Fetch a deferred explanation; wait > 0 long-polls up to that many seconds
+    202 means this worker doesn't hold the job: it may still be pending on another
+    worker (and will appear once cached) or may have expired
+    """
+    status = await wait_for_explanation(explanation_id, wait)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Explanation not found or expired")
+    if status["status"] == "unknown":
+        return JSONResponse(
+            status_code=202,
+            content={
+                **status,
+                "detail": "Not held by this worker; "
+                "it may be pending elsewhere or expired",
+            },
+        )
+    return status
+
+
+@app.get("/explanations/{explanation_id}/events")
+async def stream_explanation(explanation_id: str):
+    """
+    Server-sent events: one "explanation" event once the explanation is ready
+    """
+    if explanation_status(explanation_id) is None:
+        raise HTTPException(status_code=404, detail="Explanation not found or expired")
+
+    async def events():
+        # IDs held elsewhere are given up on once any job would have expired
+        give_up_at = time.monotonic() + EXPLANATION_JOB_TTL
+        while True:
+            status = await wait_for_explanation(explanation_id, 15)
+            if (
+                status is not None
+                and status["status"] == "unknown"
+                and time.monotonic() >= give_up_at
+            ):
+                status = None
+            if status is None or status["status"] not in ("pending", "unknown"):
+                payload = status or {
+                    "id": explanation_id,
+                    "status": "expired",
+                    "explanation": None,
+                }
+                data = json.dumps(payload, ensure_ascii=False)
+                yield f"event: explanation\ndata: {data}\n\n"
+                return
+            # Comment line keeps proxies from closing an idle connection
+            yield ": waiting\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def score_language_group(language: str, items: List[BatchItemResult]):
+    """
+    Score items of one language in length-sorted buckets, filling label and
+    confidence in place. A failed bucket marks its items with an error.
+    """
+    # Reuse cached classifications; only the rest go through the model
+    pending = []
+    for item in items:
+        cached = classification_cache.get(stage_cache_key(language, item.text))
+        if cached is None:
+            pending.append(item)
+        else:
+            item.label, item.confidence = cached[0], round(cached[1], 4)
+    items = pending
+    if not items:
+        return
+
+    tokenizer = tokenizers[language]
+    # Up to a whole batch or document, so tokenize on the inference pool rather than
+    # the event loop
+    lengths = await run_inference(
+        count_tokens, tokenizer, [item.text for item in items]
+    )
+    token_budget.record(language, lengths)
+
+    # Over-budget items fail individually before inference
+    token_limit = token_budget.max_length(language, tokenizer)
+    within_budget = []
+    for item, length in zip(items, lengths):
+        if length > token_limit:
+            item.error = (
+                f"Text too long: {length} tokens exceeds the "
+                f"{token_limit}-token limit for {language}."
+            )
+        else:
+            within_budget.append((item, length))
+    token_budget.record_rejection(language, len(items) - len(within_budget))
+
+    items = [item for item, _ in within_budget]
+    lengths = [length for _, length in within_budget]
+
+    for bucket in length_buckets(lengths):
+        bucket_items = [items[i] for i in bucket]
+        try:
+            predictions = await run_inference(
+                classify_texts, language, [item.text for item in bucket_items]
+            )
+        except Exception as e:
+            logger.error(f"Batch inference failed for {language}: {str(e)}")
+            for item in bucket_items:
+                item.error = f"Prediction failed: {str(e)}"
+            continue
+
+        for item, (label, confidence) in zip(bucket_items, predictions):
+            item.label = label
+            item.confidence = round(confidence, 4)
+            classification_cache.set(
+                stage_cache_key(language, item.text), (label, confidence)
+            )
+
+
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_batch(input_data: BatchTextInput):
+    """
+    Predict metaphors for a list of texts in one request
+    Items are grouped by language and length-bucketed into batched forward passes.
+    Results come back in input order; a failing item carries an error instead of
+    failing the whole batch.
+    """
+    try:
+        if not input_data.texts:
+            raise HTTPException(status_code=400, detail="texts cannot be empty")
+
+        if len(input_data.texts) > BULK_MAX_ITEMS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Too many texts. Please limit to {BULK_MAX_ITEMS} per request.",
+            )
+
+        results = [
+            BatchItemResult(index=i, text=text.strip())
+            for i, text in enumerate(input_data.texts)
+        ]
+
+        # Validate and group items by detected language
+        groups = {}
+        for item in results:
+            if not item.text:
+                item.error = "Input text cannot be empty"
+                continue
+            if len(item.text) > MAX_INPUT_CHARS:
+                item.error = (
+                    f"Text too long. Please limit to {MAX_INPUT_CHARS} characters."
+                )
+                continue
+
+            item.language = detect_language(item.text)
+            groups.setdefault(item.language, []).append(item)
+
+        # Run length-sorted buckets through each language model
+        for language, items in groups.items():
+            if not await model_registry.ensure_loaded(language):
+                for item in items:
+                    item.error = f"Model for {language} is not available"
+                continue
+
+            with model_registry.pinned(language):
+                await score_language_group(language, items)
+
+        # Optional per-item translation and explanation
+        if input_data.include_translation:
+            scored = [item for item in results if item.label is not None]
+            translations = await translate_concurrently(
+                [(item.text, item.language) for item in scored]
+            )
+            for item, translation in zip(scored, translations):
+                item.translation = translation
+        if input_data.include_explanation:
+            # Requested together so the explanation service can share prompts
+            metaphors = [item for item in results if item.label == "metaphor"]
+            explanations = await asyncio.gather(
+                *(
+                    explain_cached(item.text, item.language, item.confidence)
+                    for item in metaphors
+                )
+            )
+            for item, explanation in zip(metaphors, explanations):
+                item.explanation = explanation
+
+        failed = sum(1 for item in results if item.error)
+        logger.info(
+            f"Batch prediction: {len(results) - failed}/{len(results)} succeeded"
+        )
+
+        return BatchPredictionResponse(
+            count=len(results),
+            succeeded=len(results) - failed,
+            failed=failed,
+            results=results,
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Batch prediction error: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Batch prediction failed: {str(e)}"
+        )
+
+
+def summarize_document(sentences: List[DocumentSentenceResult]) -> DocumentSummary:
+    """Document-level counts and the most confident metaphorical sentences"""
+    scored = [s for s in sentences if s.label is not None]
+    metaphors = sorted(
+        (s for s in scored if s.label == "metaphor"),
+        key=lambda s: s.confidence,
+        reverse=True,
+    )
+
+    return DocumentSummary(
+        sentence_count=len(sentences),
+        scored=len(scored),
+        failed=len(sentences) - len(scored),
+        metaphor_count=len(metaphors),
+        metaphor_ratio=round(len(metaphors) / len(scored), 4) if scored else 0.0,
+        mean_confidence=(
+            round(sum(s.confidence for s in scored) / len(scored), 4)
+            if scored
+            else None
+        ),
+        top_metaphors=[s.index for s in metaphors[:5]],
+    )
+
+
+@app.post("/predict/document", response_model=DocumentPredictionResponse)
+async def predict_document(input_data: DocumentInput):
+    """
+    Predict metaphors sentence by sentence for a long document
+    The document is split on script-aware sentence boundaries, its language is
+    detected once, and all sentences go through that language model in
+    length-bucketed batches.
+    """
+    try:
+        text = input_data.text.strip()
+
+        if not text:
+            raise HTTPException(status_code=400, detail="Input text cannot be empty")
+
+        if len(text) > DOCUMENT_MAX_CHARS:
+            raise HTTPException(
+                status_code=400,
+                detail=(
+                    "Document too long. "
+                    f"Please limit to {DOCUMENT_MAX_CHARS} characters."
+                ),
+            )
+
+        segments = split_sentences(input_data.text)
+        if not segments:
+            raise HTTPException(
+                status_code=400, detail="No sentences found in document"
+            )
+
+        if len(segments) > DOCUMENT_MAX_SENTENCES:
+            raise HTTPException(
+                status_code=400,
+                detail=(
+                    "Too many sentences. "
+                    f"Please limit to {DOCUMENT_MAX_SENTENCES} per document."
+                ),
+            )
+
         language = detect_language(text)
-        logger.info(f"Detected language: {language}")
-        
-        # Check if model is loaded
-        if language not in models:
-            available_models = list(models.keys())
+        if not await model_registry.ensure_loaded(language):
             raise HTTPException(
-                status_code=500,
-                detail=f"Model for {language} is not available. Supported languages: {', '.join(available_models)}"
+                status_code=500, detail=f"Model for {language} is not available"
+            )
+
+        sentences = [
+            DocumentSentenceResult(
+                index=i,
+                text=segment.text,
+                language=language,
+                start=segment.start,
+                end=segment.end,
+            )
+            for i, segment in enumerate(segments)
+        ]
+
+        with model_registry.pinned(language):
+            await score_language_group(language, sentences)
+
+        # Optional per-sentence translation and explanation
+        if input_data.include_translation:
+            scored = [sentence for sentence in sentences if sentence.label is not None]
+            translations = await translate_concurrently(
+                [(sentence.text, language) for sentence in scored]
             )
-        
-        # Get model and tokenizer
-        model = models[language]
-        tokenizer = tokenizers[language]
-        
-        # Tokenize input
-        inputs = tokenizer(
-            text,
-            return_tensors="pt",
-            truncation=True,
-            max_length=512,
-            padding=True
-        )
-        
-        # Make prediction
-        with torch.no_grad():
-            outputs = model(**inputs)
-            logits = outputs.logits
-            probabilities = torch.softmax(logits, dim=1)
-            predicted_class = torch.argmax(probabilities, dim=1).item()
-            confidence = probabilities[0][predicted_class].item()
-        
-        # Map prediction to label
-        label = "metaphor" if predicted_class == 1 else "normal"
-        
-        logger.info(f"Prediction: {label} (confidence: {confidence:.4f})")
-        
-        # Always get translation for the input text
-        translation = translate_text(text, language)
-        
-        # Generate explanation if it's a metaphor
-        explanation = None
-        if label == "metaphor":
-            explanation = generate_metaphor_explanation(text, language, confidence)
-        
-        result_data = {
+            for sentence, translation in zip(scored, translations):
+                sentence.translation = translation
+        if input_data.include_explanation:
+            metaphors = [
+                sentence for sentence in sentences if sentence.label == "metaphor"
+            ]
+            explanations = await asyncio.gather(
+                *(
+                    explain_cached(sentence.text, language, sentence.confidence)
+                    for sentence in metaphors
+                )
+            )
+            for sentence, explanation in zip(metaphors, explanations):
+                sentence.explanation = explanation
+
+        summary = summarize_document(sentences)
+        logger.info(
+            f"Document prediction ({language}): {summary.metaphor_count} metaphors "
+            f"in {summary.sentence_count} sentences"
+        )
+
+        return DocumentPredictionResponse(
+            language=language, summary=summary, sentences=sentences
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Document prediction error: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Document prediction failed: {str(e)}"
+        )
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    Streaming response that only writes. Starlette's StreamingResponse listens
+    for disconnects on receive(), which would swallow the request body we are
+    still reading while results stream out.
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def decode_stream_line(line: bytes) -> str:
+    if line.endswith(b"\r"):
+        line = line[:-1]
+    return line.decode("utf-8", errors="replace")
+
+
+async def read_stream_lines(request: Request):
+    """
+    Yield decoded lines from the request body as they arrive, without
+    buffering the whole payload. Lines may end in LF or CRLF; oversized lines
+    are yielded as None.
+    """
+    buffer = b""
+    overflow = False
+
+    async for chunk in request.stream():
+        # One split per chunk; the unterminated tail is carried into the next one
+        *lines, buffer = (buffer + chunk).split(b"\n")
+        for line in lines:
+            oversized = overflow or len(line) > STREAM_MAX_LINE_BYTES
+            yield None if oversized else decode_stream_line(line)
+            overflow = False
+
+        # Don't let a single newline-free line grow without bound
+        if len(buffer) > STREAM_MAX_LINE_BYTES:
+            buffer = b""
+            overflow = True
+
+    if buffer or overflow:
+        yield None if overflow else decode_stream_line(buffer)
+
+
+async def score_stream_line(index: int, line: Optional[str]) -> dict:
+    """Classify one streamed line; errors are reported in the result line"""
+    if line is None:
+        return {
+            "index": index,
+            "error": "Line too long. "
+            f"Please limit lines to {STREAM_MAX_LINE_BYTES} bytes.",
+        }
+
+    # Lines may be plain text or JSON objects with a "text" field
+    text = line.strip()
+    if text.startswith("{"):
+        try:
+            text = str(json.loads(text).get("text", "")).strip()
+        except (ValueError, AttributeError):
+            pass
+
+    result = {"index": index, "text": text}
+    try:
+        if not text:
+            return {**result, "error": "Input text cannot be empty"}
+        if len(text) > MAX_INPUT_CHARS:
+            return {
+                **result,
+                "error": "Text too long. "
+                f"Please limit to {MAX_INPUT_CHARS} characters.",
+            }
+
+        cached_result = get_cached_prediction(text)
+        if cached_result:
+            return {
+                **result,
+                "language": cached_result["language"],
+                "label": cached_result["label"],
+                "confidence": cached_result["confidence"],
+            }
+
+        language = detect_language(text)
+        if not await model_registry.ensure_loaded(language):
+            return {
+                **result,
+                "language": language,
+                "error": f"Model for {language} is not available",
+            }
+
+        with model_registry.pinned(language):
+            budget_error = await token_budget_error(language, text)
+            if budget_error:
+                return {**result, "language": language, "error": budget_error}
+            label, confidence = await classify_cached(language, text)
+
+        return {
+            **result,
             "language": language,
             "label": label,
             "confidence": round(confidence, 4),
-            "text": text,
-            "translation": translation,
-            "explanation": explanation
         }
-        
-        # Cache the result
-        cache_prediction(text, result_data)
-        
-        # Save to database (async, don't wait for it)
-        try:
-            await save_prediction(result_data.copy())
-        except Exception as db_error:
-            logger.warning(f"Failed to save to database: {str(db_error)}")
-            # Don't fail the request if database save fails
-        
-        return PredictionResponse(**result_data)
-        
-    except HTTPException:
-        raise
     except Exception as e:
-        logger.error(f"Prediction error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+        logger.error(f"Stream prediction error on line {index}: {str(e)}")
+        return {**result, "error": f"Prediction failed: {str(e)}"}
+
+
+@app.post("/predict/stream")
+async def predict_stream(request: Request):
+    """
+    Score a newline-delimited stream of texts, returning NDJSON
+    One result line per input line, in input order, written as soon as it is
+    ready. At most STREAM_MAX_IN_FLIGHT lines are in progress at once, so a slow
+    reader pauses intake and memory stays constant for any input size.
+    """
+
+    async def results():
+        in_flight = deque()
+        index = 0
+
+        try:
+            async for line in read_stream_lines(request):
+                in_flight.append(asyncio.create_task(score_stream_line(index, line)))
+                index += 1
+
+                # Window full: emit the oldest result before reading more input
+                if len(in_flight) >= STREAM_MAX_IN_FLIGHT:
+                    yield json.dumps(
+                        await in_flight.popleft(), ensure_ascii=False
+                    ) + "\n"
+
+            while in_flight:
+                yield json.dumps(await in_flight.popleft(), ensure_ascii=False) + "\n"
+
+            logger.info(f"Stream prediction complete: {index} lines")
+        finally:
+            # Client went away mid-stream
+            for task in in_flight:
+                task.cancel()
+
+    return NDJSONStreamingResponse(results())
+
 
 @app.post("/translate", response_model=TranslationResponse)
 async def translate(request: TranslationRequest):
     """
     Translate text from source language to English
-    Uses googletrans library for quick translation (free, no API key needed)
+    Uses the shared translation client (free Google endpoint, no API key needed)
     For production, consider IndicTrans2 or Google Cloud Translation API
     """
     try:
-        logger.info(f"Translation request for {request.source_language}: {request.text}")
-        
-        # Try to use googletrans if available
-        try:
-            from googletrans import Translator
-            translator = Translator()
-            
-            # Map language codes
-            lang_map = {
-                'hindi': 'hi',
-                'tamil': 'ta',
-                'kannada': 'kn'
-            }
-            
-            source_lang = lang_map.get(request.source_language, 'auto')
-            result = translator.translate(request.text, src=source_lang, dest='en')
-            translated_text = result.text
-            
-            logger.info(f"Translation successful: {translated_text}")
-            
-        except ImportError:
-            # Fallback if googletrans not installed
-            logger.warning("googletrans not installed, using placeholder")
-            translated_text = f"[Translation of '{request.text}' from {request.source_language} to English. Install 'googletrans==4.0.0-rc1' for automatic translation.]"
-        except Exception as trans_error:
-            # Fallback if translation fails
-            logger.error(f"Translation error: {str(trans_error)}")
-            translated_text = f"[Translation temporarily unavailable. Original text: '{request.text}']"
-        
+        logger.info(
+            f"Translation request for {request.source_language}: {request.text}"
+        )
+
+        # Plain machine translation of the whole text; the metaphor lexicon is for
+        # predictions only
+        translated_text = await translate_cached(
+            request.text, request.source_language, use_lexicon=False
+        )
+
         return TranslationResponse(
             original_text=request.text,
             translated_text=translated_text,
-            source_language=request.source_language
+            source_language=request.source_language,
         )
-        
+
     except Exception as e:
         logger.error(f"Translation error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Translation failed: {str(e)}")
 
+
 @app.post("/speech")
 async def speech_to_text(audio: UploadFile = File(...)):
     """
@@ -584,19 +1689,24 @@ async def speech_to_text(audio: UploadFile = File(...)):
     try:
         # Placeholder for speech-to-text
         # You would integrate Whisper or another speech recognition library here
-        
+
         logger.info(f"Received audio file: {audio.filename}")
-        
+
         # For now, return a placeholder response
         return {
-            "text": "[Speech recognition would convert audio to text here. Please integrate Whisper or similar library.]",
+            "text": "[Speech recognition would convert audio to text here. Please "
+            "integrate Whisper or similar library.]",
             "success": False,
-            "message": "Speech recognition not yet implemented. Please type your text instead."
+            "message": "Speech recognition not yet implemented. "
+            "Please type your text instead.",
         }
-        
+
     except Exception as e:
         logger.error(f"Speech-to-text error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Speech recognition failed: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Speech recognition failed: {str(e)}"
+        )
+
 
 @app.get("/models/info")
 async def get_model_info():
@@ -605,62 +1715,122 @@ async def get_model_info():
     """
     try:
         model_info = {}
-        
+
         for lang, model in models.items():
             try:
-                # Get model parameters count
-                total_params = sum(p.numel() for p in model.parameters())
-                trainable_params = sum(p.numel() for p in model.parameters() if p.requires_grad)
-                
+                # Parameter counts and size from the active engine
+                engine_info = inference_engine.model_info(model)
+
                 # Get model config if available
                 config_info = {}
-                if hasattr(model, 'config'):
+                if hasattr(model, "config"):
                     config_info = {
-                        "model_type": getattr(model.config, 'model_type', 'unknown'),
-                        "hidden_size": getattr(model.config, 'hidden_size', 'unknown'),
-                        "num_layers": getattr(model.config, 'num_hidden_layers', 'unknown'),
-                        "vocab_size": getattr(model.config, 'vocab_size', 'unknown')
+                        "model_type": getattr(model.config, "model_type", "unknown"),
+                        "hidden_size": getattr(model.config, "hidden_size", "unknown"),
+                        "num_layers": getattr(
+                            model.config, "num_hidden_layers", "unknown"
+                        ),
+                        "vocab_size": getattr(model.config, "vocab_size", "unknown"),
                     }
-                
+
                 model_info[lang] = {
-                    "total_parameters": total_params,
-                    "trainable_parameters": trainable_params,
-                    "model_size_mb": total_params * 4 / 1024 / 1024,  # Approximate size in MB
+                    **engine_info,
                     "config": config_info,
-                    "tokenizer_vocab_size": len(tokenizers[lang]) if lang in tokenizers else 0
+                    "quantization": quantization_reports.get(lang),
+                    "load_timings": model_load_timings.get(lang),
+                    "dedup": dedup_reports.get(lang),
+                    "tokenizer_vocab_size": (
+                        len(tokenizers[lang]) if lang in tokenizers else 0
+                    ),
                 }
             except Exception as e:
                 model_info[lang] = {"error": str(e)}
-        
+
         return {
             "models": model_info,
             "total_models": len(models),
-            "supported_languages": list(LANGUAGE_MAP.values())
+            "inference_engine": inference_engine.name,
+            "startup_load_seconds": startup_load_seconds,
+            "dedup_enabled": MODEL_DEDUP,
+            "dedup_saved_mb": round(
+                sum(
+                    dedup_reports[lang]["shared_mb"]
+                    for lang in models
+                    if lang in dedup_reports
+                ),
+                2,
+            ),
+            "quantization_mode": MODEL_QUANTIZATION,
+            "supported_languages": list(LANGUAGE_MAP.values()),
         }
-        
+
     except Exception as e:
         logger.error(f"Model info error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to get model info: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Failed to get model info: {str(e)}"
+        )
+
+
+@app.get("/models/token-stats")
+async def get_token_stats():
+    """
+    Get per-language token length statistics and the active token limits
+    """
+    return {
+        "pad_to_multiple_of": PAD_TO_MULTIPLE_OF,
+        "languages": token_budget.summary(tokenizers),
+    }
+
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Get prediction cache size, hit/miss and eviction counters
+    """
+    return {
+        "ttl_seconds": {
+            "default": CACHE_TTL,
+            "explained": CACHE_TTL_EXPLAINED,
+            "degraded": CACHE_TTL_DEGRADED,
+        },
+        "prediction": prediction_cache.stats(),
+        "classification": classification_cache.stats(),
+        "translation": translation_cache.stats(),
+        "explanation": explanation_cache.stats(),
+        "model_fingerprint": MODEL_FINGERPRINT,
+        "persistent": (
+            await run_blocking(persistent_cache.stats) if persistent_cache else None
+        ),
+        "single_flight": prediction_flights.stats(),
+    }
+
+
+@app.get("/models/cascade")
+async def get_cascade_stats():
+    """
+    Get first-stage hit rates and agreement with the full models
+    """
+    return cascade.report()
+
 
 # ==================== HISTORY ENDPOINTS ====================
 
+
 @app.get("/history")
 async def get_history(
     limit: int = Query(50, ge=1, le=100, description="Number of results to return"),
     skip: int = Query(0, ge=0, description="Number of results to skip"),
     language: Optional[str] = Query(None, description="Filter by language"),
-    label: Optional[str] = Query(None, description="Filter by label (metaphor/normal)")
+    label: Optional[str] = Query(None, description="Filter by label (metaphor/normal)"),
 ):
     """
     Get prediction history with optional filters
     """
     try:
-        history = await get_prediction_history(limit=limit, skip=skip, language=language, label=label)
-        return {
-            "success": True,
-            "count": len(history),
-            "history": history
-        }
+        history = await get_prediction_history(
+            limit=limit, skip=skip, language=language, label=label
+        )
+        return {"success": True, "count": len(history), "history": history}
     except Exception as e:
         logger.error(f"Failed to get history: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get history: {str(e)}")
@@ -680,7 +1850,9 @@ async def get_history_item(prediction_id: str):
         raise
     except Exception as e:
         logger.error(f"Failed to get prediction: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to get prediction: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Failed to get prediction: {str(e)}"
+        )
 
 
 @app.delete("/history/{prediction_id}")
@@ -691,13 +1863,17 @@ async def delete_history_item(prediction_id: str):
     try:
         success = await delete_prediction(prediction_id)
         if not success:
-            raise HTTPException(status_code=404, detail="Prediction not found or already deleted")
+            raise HTTPException(
+                status_code=404, detail="Prediction not found or already deleted"
+            )
         return {"success": True, "message": "Prediction deleted successfully"}
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Failed to delete prediction: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to delete prediction: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Failed to delete prediction: {str(e)}"
+        )
 
 
 @app.delete("/history")
@@ -710,11 +1886,13 @@ async def clear_history():
         return {
             "success": True,
             "message": f"Cleared {count} predictions from history",
-            "deleted_count": count
+            "deleted_count": count,
         }
     except Exception as e:
         logger.error(f"Failed to clear history: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to clear history: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Failed to clear history: {str(e)}"
+        )
 
 
 @app.get("/statistics")
@@ -724,15 +1902,15 @@ async def get_stats():
     """
     try:
         stats = await get_statistics()
-        return {
-            "success": True,
-            "statistics": stats
-        }
+        return {"success": True, "statistics": stats}
     except Exception as e:
         logger.error(f"Failed to get statistics: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to get statistics: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Failed to get statistics: {str(e)}"
+        )
 
 
 if __name__ == "__main__":
     import uvicorn
+
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,179 @@
+"""
+Lazy per-language model registry with LRU eviction
+
+With MODEL_LAZY_LOADING=true a language's tokenizer and model are loaded on
+first use instead of at startup. Concurrent first requests share the same
+load, and the least recently used models are evicted to stay within
+MAX_RESIDENT_MODELS and MODEL_MEMORY_BUDGET_MB.
+"""
+
+import asyncio
+import gc
+import logging
+import os
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from executor import run_blocking
+
+logger = logging.getLogger(__name__)
+
+# Registry configuration
+MODEL_LAZY_LOADING = os.getenv("MODEL_LAZY_LOADING", "false").lower() == "true"
+MAX_RESIDENT_MODELS = int(os.getenv("MAX_RESIDENT_MODELS", "0"))  # 0 = unlimited
+# Memory cap for resident models (0 = unlimited)
+MODEL_MEMORY_BUDGET_MB = float(os.getenv("MODEL_MEMORY_BUDGET_MB", "0"))
+
+
+class ModelRegistry:
+    """
+    Tracks which language models are resident in the shared models/tokenizers
+    dicts, loads missing ones on demand and evicts the least recently used
+    """
+
+    def __init__(
+        self,
+        models: dict,
+        tokenizers: dict,
+        loader: Callable[[str], bool],
+        size_fn: Callable[[str], float],
+        max_resident: int = MAX_RESIDENT_MODELS,
+        memory_budget_mb: float = MODEL_MEMORY_BUDGET_MB,
+    ):
+        """
+        Args:
+            models, tokenizers: The dicts inference reads from
+            loader: Loads one language into those dicts, returns success
+            size_fn: Resident size of a loaded language in MB
+        """
+        self.models = models
+        self.tokenizers = tokenizers
+        self.loader = loader
+        self.size_fn = size_fn
+        self.max_resident = max_resident
+        self.memory_budget_mb = memory_budget_mb
+
+        self.available: List[str] = []
+        # Resident languages in LRU order, oldest first
+        self.resident: "OrderedDict[str, float]" = OrderedDict()
+        self.loading: Dict[str, asyncio.Future] = {}
+        self.pins: Dict[str, int] = {}
+
+        # Counters for /health
+        self.loads = 0
+        self.evictions = 0
+        self.last_load_seconds: Dict[str, float] = {}
+
+    def set_available(self, languages: List[str]):
+        """Languages that have a model directory on disk"""
+        self.available = list(languages)
+
+    def register_loaded(self):
+        """Record models that were loaded eagerly outside the registry"""
+        for language in self.models:
+            if language not in self.resident:
+                self.resident[language] = self.size_fn(language)
+
+    def is_available(self, language: str) -> bool:
+        return language in self.models or language in self.available
+
+    async def ensure_loaded(self, language: str) -> bool:
+        """Make a language resident, loading it if needed. False if it can't load."""
+        if language in self.models:
+            if language in self.resident:
+                self.resident.move_to_end(language)
+            return True
+
+        if language not in self.available:
+            return False
+
+        # Concurrent first requests wait on the same load
+        if language not in self.loading:
+            self.loading[language] = asyncio.ensure_future(self._load(language))
+        return await asyncio.shield(self.loading[language])
+
+    async def _load(self, language: str) -> bool:
+        try:
+            # Make room by count before loading; bytes are known only afterwards
+            if self.max_resident > 0:
+                self._evict(keep=language, max_count=self.max_resident - 1)
+
+            started = time.perf_counter()
+            loaded = await run_blocking(self.loader, language)
+            if not loaded:
+                return False
+
+            self.last_load_seconds[language] = round(time.perf_counter() - started, 3)
+            self.resident[language] = self.size_fn(language)
+            self.loads += 1
+            logger.info(
+                f"✓ Lazily loaded {language} model in "
+                f"{self.last_load_seconds[language]}s"
+            )
+
+            self._evict(keep=language)
+            return True
+        finally:
+            self.loading.pop(language, None)
+
+    @contextmanager
+    def pinned(self, language: str):
+        """Keep a language resident while requests are using it"""
+        self.pins[language] = self.pins.get(language, 0) + 1
+        try:
+            yield
+        finally:
+            self.pins[language] -= 1
+            if self.pins[language] <= 0:
+                del self.pins[language]
+
+    def _evict(self, keep: str, max_count: Optional[int] = None):
+        """Evict least recently used, unpinned models until within limits"""
+        if max_count is None:
+            max_count = self.max_resident if self.max_resident > 0 else None
+
+        def over_budget() -> bool:
+            if max_count is not None and len(self.resident) > max_count:
+                return True
+            if (
+                self.memory_budget_mb > 0
+                and sum(self.resident.values()) > self.memory_budget_mb
+            ):
+                return True
+            return False
+
+        evicted = False
+        for language in list(self.resident):
+            if not over_budget():
+                break
+            if language == keep or self.pins.get(language):
+                continue
+
+            self.models.pop(language, None)
+            self.tokenizers.pop(language, None)
+            freed = self.resident.pop(language)
+            self.evictions += 1
+            evicted = True
+            logger.info(
+                f"Evicted {language} model ({freed:.1f} MB, least recently used)"
+            )
+
+        if evicted:
+            gc.collect()
+
+    def stats(self) -> dict:
+        """Registry state for /health"""
+        return {
+            "lazy_loading": MODEL_LAZY_LOADING,
+            "resident": list(self.resident),
+            "resident_mb": round(sum(self.resident.values()), 2),
+            "available": self.available,
+            "loading": list(self.loading),
+            "max_resident_models": self.max_resident,
+            "memory_budget_mb": self.memory_budget_mb,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "last_load_seconds": self.last_load_seconds,
+        }
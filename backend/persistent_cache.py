@@ -0,0 +1,273 @@
+"""
+Persistent second-level cache
+
+An SQLite file shared by every worker process on a node and kept across
+restarts. The in-memory caches read through to it on a miss and write through
+to it on every store, so a fresh worker starts with the node's hot results.
+The file is capped at PERSISTENT_CACHE_MAX_MB; least recently used rows are
+deleted first.
+
+Reads and writes happen on the request path, so they wait at most
+PERSISTENT_CACHE_BUSY_MS for a lock held by another worker and are skipped
+(a miss, or an entry not persisted) rather than stalling the event loop.
+Size enforcement and expiry run on background threads.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Persistent cache configuration
+PERSISTENT_CACHE = os.getenv("PERSISTENT_CACHE", "false").lower() == "true"
+PERSISTENT_CACHE_PATH = Path(
+    os.getenv(
+        "PERSISTENT_CACHE_PATH",
+        str(Path(__file__).parent.parent / "cache" / "results.sqlite3"),
+    )
+)
+PERSISTENT_CACHE_MAX_MB = float(os.getenv("PERSISTENT_CACHE_MAX_MB", "512"))
+PERSISTENT_CACHE_BUSY_MS = float(os.getenv("PERSISTENT_CACHE_BUSY_MS", "50"))
+
+# Size is checked every this many writes rather than on each one
+SIZE_CHECK_INTERVAL = 500
+# Reads refresh a row's LRU timestamp at most this often
+TOUCH_INTERVAL = 60
+# Background maintenance may wait this long for the write lock
+MAINTENANCE_TIMEOUT = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires_at);
+"""
+
+
+class PersistentCache:
+    """SQLite-backed key-value store with expiry and a size cap"""
+
+    def __init__(self, path: Path, max_mb: float = PERSISTENT_CACHE_MAX_MB):
+        self.name = "persistent"
+        self.path = path
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+        self.busy = 0
+        self._enforcing = threading.Lock()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._maintenance_connection()
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread and process (connections must not cross a fork)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._open(PERSISTENT_CACHE_BUSY_MS / 1000)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _maintenance_connection(self) -> sqlite3.Connection:
+        """Short-lived connection for background work, which can wait for locks"""
+        return self._open(MAINTENANCE_TIMEOUT)
+
+    def _open(self, timeout: float) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), timeout=timeout, isolation_level=None)
+        # WAL lets worker processes read while another writes
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _failed(self, action: str, error: Exception):
+        if isinstance(error, sqlite3.OperationalError) and "locked" in str(error):
+            # Another worker holds the lock; skip rather than block the caller
+            self.busy += 1
+            return
+        self.errors += 1
+        logger.warning(f"Persistent cache {action} failed: {str(error)}")
+
+    def get(self, namespace: str, key: str) -> Optional[tuple]:
+        """Returns (value, expires_at) or None"""
+        now = time.time()
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT value, expires_at, accessed_at FROM entries "
+                "WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+
+            if row is None or row[1] <= now:
+                self.misses += 1
+                return None
+
+            if now - row[2] > TOUCH_INTERVAL:
+                conn.execute(
+                    "UPDATE entries SET accessed_at = ? "
+                    "WHERE namespace = ? AND key = ?",
+                    (now, namespace, key),
+                )
+            self.hits += 1
+            return json.loads(row[0]), row[1]
+        except (sqlite3.Error, ValueError) as e:
+            self._failed("read", e)
+            return None
+
+    def set(self, namespace: str, key: str, value: Any, expires_at: float):
+        try:
+            encoded = json.dumps(value, ensure_ascii=False)
+            now = time.time()
+            self._connection().execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    namespace,
+                    key,
+                    encoded,
+                    len(encoded.encode("utf-8")),
+                    expires_at,
+                    now,
+                ),
+            )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            self._failed("write", e)
+            return
+
+        with self._lock:
+            self.writes += 1
+            check_size = self.writes % SIZE_CHECK_INTERVAL == 0
+        if check_size and not self._enforcing.locked():
+            threading.Thread(
+                target=self.enforce_size, name="persistent-cache-size", daemon=True
+            ).start()
+
+    def delete(self, namespace: str, key: str):
+        try:
+            self._connection().execute(
+                "DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+            )
+        except sqlite3.Error as e:
+            self._failed("delete", e)
+
+    def size_bytes(self, conn: Optional[sqlite3.Connection] = None) -> int:
+        row = (
+            (conn or self._connection())
+            .execute("SELECT COALESCE(SUM(size), 0) FROM entries")
+            .fetchone()
+        )
+        return int(row[0])
+
+    def enforce_size(self):
+        """Delete least recently used rows until the values fit in 90% of the cap"""
+        if not self._enforcing.acquire(blocking=False):
+            return
+        conn = None
+        try:
+            conn = self._maintenance_connection()
+            size = self.size_bytes(conn)
+            if size <= self.max_bytes:
+                return
+            excess = size - int(self.max_bytes * 0.9)
+
+            rows = conn.execute(
+                "SELECT namespace, key, size FROM entries ORDER BY accessed_at"
+            ).fetchall()
+            victims = []
+            for namespace, key, size in rows:
+                if excess <= 0:
+                    break
+                victims.append((namespace, key))
+                excess -= size
+
+            conn.executemany(
+                "DELETE FROM entries WHERE namespace = ? AND key = ?", victims
+            )
+            self.evictions += len(victims)
+            logger.info(
+                f"Evicted {len(victims)} entries from persistent cache (size cap)"
+            )
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Persistent cache eviction failed: {str(e)}")
+        finally:
+            if conn is not None:
+                conn.close()
+            self._enforcing.release()
+
+    def sweep(self) -> int:
+        """Delete expired rows, then enforce the size cap; returns the expired count"""
+        try:
+            conn = self._maintenance_connection()
+            try:
+                removed = conn.execute(
+                    "DELETE FROM entries WHERE expires_at <= ?", (time.time(),)
+                ).rowcount
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Persistent cache sweep failed: {str(e)}")
+            return 0
+        self.enforce_size()
+        return removed
+
+    def stats(self) -> dict:
+        """Counts rows and bytes, so call it off the event loop"""
+        try:
+            conn = self._maintenance_connection()
+            try:
+                entries = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+                size = self.size_bytes(conn)
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            entries, size = None, None
+
+        lookups = self.hits + self.misses
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "busy_skips": self.busy,
+            "errors": self.errors,
+        }
+
+
+def create_persistent_cache() -> Optional[PersistentCache]:
+    """The node-wide cache when PERSISTENT_CACHE=true, else None"""
+    if not PERSISTENT_CACHE:
+        return None
+    try:
+        cache = PersistentCache(PERSISTENT_CACHE_PATH)
+        logger.info(f"✓ Persistent cache at {PERSISTENT_CACHE_PATH}")
+        return cache
+    except (sqlite3.Error, OSError) as e:
+        logger.error(f"✗ Persistent cache unavailable: {str(e)}")
+        return None
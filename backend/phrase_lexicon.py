@@ -0,0 +1,189 @@
+"""
+Metaphor phrase lexicon
+
+Known metaphorical phrases and their English translations, kept in one
+tab-separated file per language (lexicon/<language>.tsv). Each language's
+phrases are compiled once into an Aho-Corasick automaton, so a text is checked
+against the whole lexicon in a single pass; when several phrases occur, the
+longest one wins. Edited files are picked up without a restart: their
+modification times are rechecked at most every LEXICON_RELOAD_INTERVAL seconds.
+"""
+
+import logging
+import os
+import threading
+import time
+import unicodedata
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Lexicon configuration
+PHRASE_LEXICON_DIR = Path(
+    os.getenv("PHRASE_LEXICON_DIR", str(Path(__file__).parent / "lexicon"))
+)
+# Seconds between checks for edited files (0 = never reload)
+LEXICON_RELOAD_INTERVAL = float(os.getenv("LEXICON_RELOAD_INTERVAL", "5"))
+
+
+class PhraseAutomaton:
+    """Aho-Corasick automaton over a phrase -> translation mapping"""
+
+    def __init__(self, phrases: Dict[str, str]):
+        self.phrases = phrases
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Longest phrase ending at each state, following failure links
+        self._longest: List[Optional[str]] = [None]
+
+        for phrase in phrases:
+            state = 0
+            for char in phrase:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._longest.append(None)
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._longest[state] = phrase
+
+        # Breadth-first, so a state's failure target is finished before it
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            if self._longest[state] is None:
+                self._longest[state] = self._longest[self._fail[state]]
+            for char, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                queue.append(child)
+
+    def __len__(self) -> int:
+        return len(self.phrases)
+
+    def longest_match(self, text: str) -> Optional[str]:
+        """Longest phrase occurring in text (earliest on ties), or None"""
+        best = None
+        state = 0
+        for char in text:
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            phrase = self._longest[state]
+            if phrase and (best is None or len(phrase) > len(best)):
+                best = phrase
+        return best
+
+
+def read_lexicon_file(path: Path) -> Dict[str, str]:
+    """Parse phrase<TAB>translation lines, skipping blanks and # comments"""
+    phrases = {}
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            phrase, _, translation = line.partition("\t")
+            if not phrase.strip() or not translation.strip():
+                logger.warning(
+                    f"⚠️ Skipping malformed lexicon line {path.name}:{line_number}"
+                )
+                continue
+            phrases[unicodedata.normalize("NFC", phrase.strip())] = translation.strip()
+    return phrases
+
+
+class PhraseLexicon:
+    """Per-language phrase automata loaded from a directory and reloaded on change"""
+
+    def __init__(
+        self,
+        directory: Path = PHRASE_LEXICON_DIR,
+        reload_interval: float = LEXICON_RELOAD_INTERVAL,
+    ):
+        self.directory = directory
+        self.reload_interval = reload_interval
+        self._automata: Dict[str, PhraseAutomaton] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.reloads = 0
+        self.matches = 0
+
+    def load(self):
+        """(Re)build automata for lexicon files added or changed since the last load"""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                files = {path.stem: path for path in self.directory.glob("*.tsv")}
+                mtimes = {
+                    language: path.stat().st_mtime for language, path in files.items()
+                }
+            except OSError as e:
+                logger.error(
+                    f"✗ Could not read phrase lexicon directory {self.directory}: "
+                    f"{str(e)}"
+                )
+                return
+
+            if mtimes == self._mtimes:
+                return
+
+            automata = {}
+            for language, path in files.items():
+                if (
+                    self._mtimes.get(language) == mtimes[language]
+                    and language in self._automata
+                ):
+                    automata[language] = self._automata[language]
+                    continue
+                try:
+                    automata[language] = PhraseAutomaton(read_lexicon_file(path))
+                    logger.info(
+                        f"✓ Loaded {len(automata[language])} {language} lexicon phrases"
+                    )
+                except (OSError, UnicodeDecodeError) as e:
+                    logger.error(f"✗ Failed to load {path.name}: {str(e)}")
+                    if language in self._automata:
+                        automata[language] = self._automata[language]
+
+            # Swapped in whole, so concurrent lookups see the old or the new lexicon
+            if self._mtimes:
+                self.reloads += 1
+            self._automata = automata
+            self._mtimes = mtimes
+
+    def lookup(self, language: str, text: str) -> Optional[Tuple[str, str]]:
+        """(phrase, translation) for the longest known phrase in text, or None"""
+        if (
+            self.reload_interval
+            and time.monotonic() - self._checked_at >= self.reload_interval
+        ):
+            self.load()
+
+        automaton = self._automata.get(language)
+        if automaton is None:
+            return None
+
+        phrase = automaton.longest_match(unicodedata.normalize("NFC", text))
+        if phrase is None:
+            return None
+        self.matches += 1
+        return phrase, automaton.phrases[phrase]
+
+    def stats(self) -> dict:
+        return {
+            "directory": str(self.directory),
+            "phrases": {
+                language: len(automaton)
+                for language, automaton in self._automata.items()
+            },
+            "reload_interval_seconds": self.reload_interval,
+            "reloads": self.reloads,
+            "matches": self.matches,
+        }
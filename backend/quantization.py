@@ -0,0 +1,159 @@
+"""
+Dynamic int8 quantization for the language classifiers
+
+When MODEL_QUANTIZATION=int8, the Linear layers of each model are quantized
+at load time and the result is checked against the fp32 model on a small
+bundled sample set before it is put into service.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+import numpy as np
+import torch
+
+logger = logging.getLogger(__name__)
+
+# Quantization configuration
+MODEL_QUANTIZATION = os.getenv("MODEL_QUANTIZATION", "none").lower()  # none | int8
+PARITY_MIN_AGREEMENT = float(os.getenv("PARITY_MIN_AGREEMENT", "0.9"))
+PARITY_MAX_CONFIDENCE_DELTA = float(os.getenv("PARITY_MAX_CONFIDENCE_DELTA", "0.1"))
+PARITY_SAMPLES_PATH = Path(__file__).parent / "parity_samples.json"
+
+
+def quantization_enabled() -> bool:
+    """Whether int8 quantization was requested"""
+    return MODEL_QUANTIZATION == "int8"
+
+
+def load_parity_samples(language: str) -> List[str]:
+    """Bundled sample sentences for a language"""
+    try:
+        with open(PARITY_SAMPLES_PATH, encoding="utf-8") as f:
+            return json.load(f).get(language, [])
+    except Exception as e:
+        logger.warning(f"Could not read parity samples: {str(e)}")
+        return []
+
+
+def quantize_model(model):
+    """Apply dynamic int8 quantization to every Linear layer"""
+    if "fbgemm" not in torch.backends.quantized.supported_engines:
+        # ARM CPUs only ship the qnnpack backend
+        torch.backends.quantized.engine = "qnnpack"
+
+    return torch.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
+
+def quantize_onnx_file(source_path: Path, target_path: Path):
+    """Write a dynamic int8 copy of an ONNX model (MatMul/Gemm weights)"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(str(source_path), str(target_path), weight_type=QuantType.QInt8)
+
+
+def _torch_probabilities(model, tokenizer) -> Callable[[List[str]], np.ndarray]:
+    """Wrap a PyTorch classifier as texts -> class probabilities"""
+
+    def predict(texts: List[str]) -> np.ndarray:
+        inputs = tokenizer(
+            texts, return_tensors="pt", truncation=True, max_length=512, padding=True
+        )
+        with torch.no_grad():
+            return torch.softmax(model(**inputs).logits, dim=1).numpy()
+
+    return predict
+
+
+def parity_check(language: str, reference_fn: Callable, candidate_fn: Callable) -> dict:
+    """
+    Compare labels and confidences of a candidate model against the reference
+
+    Args:
+        reference_fn, candidate_fn: texts -> class probabilities
+
+    Returns:
+        Report with label agreement, confidence deltas and a passed flag
+    """
+    samples = load_parity_samples(language)
+    if not samples:
+        return {
+            "samples": 0,
+            "passed": True,
+            "note": "no parity samples for this language",
+        }
+
+    reference = np.asarray(reference_fn(samples))
+    candidate = np.asarray(candidate_fn(samples))
+
+    ref_labels = reference.argmax(axis=1)
+    cand_labels = candidate.argmax(axis=1)
+    agreement = float((ref_labels == cand_labels).mean())
+
+    # Confidence of the reference label under both models
+    rows = np.arange(len(samples))
+    deltas = np.abs(reference[rows, ref_labels] - candidate[rows, ref_labels])
+
+    report = {
+        "samples": len(samples),
+        "label_agreement": round(agreement, 4),
+        "max_confidence_delta": round(float(deltas.max()), 4),
+        "mean_confidence_delta": round(float(deltas.mean()), 4),
+    }
+    report["passed"] = (
+        agreement >= PARITY_MIN_AGREEMENT
+        and report["max_confidence_delta"] <= PARITY_MAX_CONFIDENCE_DELTA
+    )
+    return report
+
+
+def apply_quantization(language: str, model, tokenizer) -> Tuple[object, dict]:
+    """
+    Quantize a loaded fp32 model and verify it on the parity samples
+
+    Returns:
+        (model to serve, report). The fp32 model is kept if parity fails.
+    """
+    fp32_size = model_size_bytes(model)
+    quantized = quantize_model(model)
+    report = parity_check(
+        language,
+        _torch_probabilities(model, tokenizer),
+        _torch_probabilities(quantized, tokenizer),
+    )
+    report["fp32_size_mb"] = round(fp32_size / 1024 / 1024, 2)
+    report["int8_size_mb"] = round(model_size_bytes(quantized) / 1024 / 1024, 2)
+
+    if not report["passed"]:
+        logger.warning(
+            f"✗ int8 parity check failed for {language} "
+            f"(agreement {report['label_agreement']}, max Δconf "
+            f"{report['max_confidence_delta']}), keeping fp32 model"
+        )
+        report["quantized"] = False
+        return model, report
+
+    logger.info(
+        f"✓ Quantized {language} model to int8: {report['fp32_size_mb']} MB → "
+        f"{report['int8_size_mb']} MB "
+        f"(agreement {report.get('label_agreement', 'n/a')})"
+    )
+    report["quantized"] = True
+    return quantized, report
+
+
+def model_size_bytes(model) -> int:
+    """In-memory size of a model's weights, counting packed int8 Linear weights"""
+    total = 0
+    for value in model.state_dict().values():
+        # Dynamic quantized Linear layers store (weight, bias) tuples
+        tensors = value if isinstance(value, (tuple, list)) else (value,)
+        for tensor in tensors:
+            if isinstance(tensor, torch.Tensor):
+                total += tensor.numel() * tensor.element_size()
+    return total
@@ -0,0 +1,322 @@
+"""
+Offline batch scoring
+
+Scores a CSV, JSONL or plain-text file with the same models the API loads,
+without starting FastAPI or MongoDB. Input is split into chunks that a pool of
+worker processes scores in parallel; results are appended to a JSONL output
+file as chunks finish and a checkpoint records progress, so a killed job
+resumes where it stopped.
+
+Usage:
+    python score_cli.py sentences.txt -o results.jsonl --workers 4
+    python score_cli.py data.csv --text-column sentence \
+        --no-translation --no-explanation
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Iterator, List, Set, Tuple
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger("score_cli")
+
+# (input row number, text)
+Record = Tuple[int, str]
+
+
+# ==================== INPUT ====================
+
+
+def read_records(path: Path, text_field: str) -> Iterator[Record]:
+    """Stream (index, text) pairs from a .csv, .jsonl or plain-text file"""
+    suffix = path.suffix.lower()
+
+    with open(path, encoding="utf-8", newline="") as f:
+        if suffix == ".csv":
+            for index, row in enumerate(csv.DictReader(f)):
+                yield index, row.get(text_field, "")
+        elif suffix in (".jsonl", ".ndjson"):
+            for index, line in enumerate(f):
+                try:
+                    yield index, str(json.loads(line).get(text_field, ""))
+                except (ValueError, AttributeError):
+                    yield index, ""
+        else:
+            for index, line in enumerate(f):
+                yield index, line.rstrip("\n")
+
+
+def chunked(
+    records: Iterator[Record], chunk_size: int
+) -> Iterator[Tuple[int, List[Record]]]:
+    """Group records into numbered chunks"""
+    chunk, chunk_id = [], 0
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk_id, chunk
+            chunk, chunk_id = [], chunk_id + 1
+    if chunk:
+        yield chunk_id, chunk
+
+
+# ==================== CHECKPOINTS ====================
+
+
+class Checkpoint:
+    """
+    Append-only progress log next to the output file
+
+    The first line describes the job; every later line records a finished
+    chunk and the output file size after its results were written. On resume
+    the output is truncated to the last recorded size, dropping any partial
+    write from the killed run.
+    """
+
+    def __init__(self, path: Path, job: dict):
+        self.path = path
+        self.job = job
+        self.done: Set[int] = set()
+        self.output_size = 0
+
+    def load(self, restart: bool) -> bool:
+        """Read previous progress. Returns True when resuming."""
+        if restart or not self.path.exists():
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"job": self.job}) + "\n")
+            return False
+
+        with open(self.path, encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+
+        if not lines or lines[0].get("job") != self.job:
+            raise SystemExit(
+                f"Checkpoint {self.path} belongs to a different job. "
+                "Use --restart to discard it."
+            )
+
+        for entry in lines[1:]:
+            self.done.add(entry["chunk"])
+            self.output_size = max(self.output_size, entry["output_size"])
+        return True
+
+    def record(self, chunk_id: int, output_size: int):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"chunk": chunk_id, "output_size": output_size}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.done.add(chunk_id)
+
+
+# ==================== WORKERS ====================
+
+
+def init_worker(torch_threads: int):
+    """Load the API's models once per worker process"""
+    import torch
+
+    torch.set_num_threads(torch_threads)
+
+    import main
+
+    main.load_models()
+
+
+def score_chunk(
+    chunk_id: int,
+    records: List[Record],
+    include_translation: bool,
+    include_explanation: bool,
+) -> Tuple[int, List[dict]]:
+    """Score one chunk with the API's detection, token budget and batching code"""
+    import asyncio
+
+    import main
+
+    items = [
+        main.BatchItemResult(index=index, text=(text or "").strip())
+        for index, text in records
+    ]
+
+    groups = {}
+    for item in items:
+        if not item.text:
+            item.error = "Input text cannot be empty"
+            continue
+        if len(item.text) > main.MAX_INPUT_CHARS:
+            item.error = (
+                f"Text too long. Please limit to {main.MAX_INPUT_CHARS} characters."
+            )
+            continue
+
+        item.language = main.detect_language(item.text)
+        if item.language not in main.models:
+            item.error = f"Model for {item.language} is not available"
+            continue
+        groups.setdefault(item.language, []).append(item)
+
+    for language, group in groups.items():
+        asyncio.run(main.score_language_group(language, group))
+
+    if include_translation:
+        for item in items:
+            if item.label is not None:
+                item.translation = main.translate_text(item.text, item.language)
+
+    if include_explanation:
+        # Explained concurrently so metaphors are packed into shared Gemini prompts
+        metaphors = [item for item in items if item.label == "metaphor"]
+
+        async def explain_all():
+            return await asyncio.gather(
+                *(
+                    main.explain_cached(item.text, item.language, item.confidence)
+                    for item in metaphors
+                )
+            )
+
+        for item, explanation in zip(metaphors, asyncio.run(explain_all())):
+            item.explanation = explanation
+
+    return chunk_id, [item.model_dump() for item in items]
+
+
+# ==================== DRIVER ====================
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Score a file of sentences offline")
+    parser.add_argument(
+        "input",
+        type=Path,
+        help=".csv, .jsonl or plain-text file (one sentence per line)",
+    )
+    parser.add_argument(
+        "-o", "--output", type=Path, help="JSONL output (default: <input>.scored.jsonl)"
+    )
+    parser.add_argument(
+        "--text-field",
+        "--text-column",
+        dest="text_field",
+        default="text",
+        help="CSV column or JSON field holding the text",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=max(1, (os.cpu_count() or 1) // 2)
+    )
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument(
+        "--no-translation", action="store_true", help="Skip translation"
+    )
+    parser.add_argument(
+        "--no-explanation", action="store_true", help="Skip Gemini explanations"
+    )
+    parser.add_argument(
+        "--checkpoint", type=Path, help="Progress file (default: <output>.checkpoint)"
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="Ignore any previous progress"
+    )
+    args = parser.parse_args()
+
+    if not args.input.exists():
+        logger.error(f"Input file not found: {args.input}")
+        return 1
+
+    output = args.output or args.input.with_suffix(".scored.jsonl")
+    checkpoint = Checkpoint(
+        args.checkpoint or output.with_name(output.name + ".checkpoint"),
+        job={
+            "input": str(args.input.resolve()),
+            "input_size": args.input.stat().st_size,
+            "chunk_size": args.chunk_size,
+            "text_field": args.text_field,
+        },
+    )
+
+    resuming = checkpoint.load(args.restart)
+    if resuming and output.exists():
+        # Drop results written after the last checkpointed chunk
+        with open(output, "r+b") as f:
+            f.truncate(checkpoint.output_size)
+        logger.info(f"Resuming: {len(checkpoint.done)} chunks already scored")
+    elif not resuming:
+        output.write_bytes(b"")
+
+    torch_threads = max(1, (os.cpu_count() or 1) // args.workers)
+    pending = (
+        (chunk_id, records)
+        for chunk_id, records in chunked(
+            read_records(args.input, args.text_field), args.chunk_size
+        )
+        if chunk_id not in checkpoint.done
+    )
+
+    started = time.time()
+    scored = 0
+
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=get_context("spawn"),
+        initializer=init_worker,
+        initargs=(torch_threads,),
+    ) as pool, open(output, "ab") as out:
+
+        def submit_next() -> bool:
+            job = next(pending, None)
+            if job is None:
+                return False
+            in_flight.add(
+                pool.submit(
+                    score_chunk,
+                    job[0],
+                    job[1],
+                    not args.no_translation,
+                    not args.no_explanation,
+                )
+            )
+            return True
+
+        # Keep a bounded number of chunks in flight; the input is never fully in memory
+        in_flight = set()
+        for _ in range(args.workers * 2):
+            if not submit_next():
+                break
+
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk_id, results = future.result()
+                out.write(
+                    "".join(
+                        json.dumps(r, ensure_ascii=False) + "\n" for r in results
+                    ).encode("utf-8")
+                )
+                out.flush()
+                os.fsync(out.fileno())
+                checkpoint.record(chunk_id, out.tell())
+
+                scored += len(results)
+                elapsed = time.time() - started
+                logger.info(
+                    f"✓ Chunk {chunk_id}: {scored} rows this run "
+                    f"({scored / elapsed:.1f} rows/s)"
+                )
+                submit_next()
+
+    logger.info(f"✓ Done: results in {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
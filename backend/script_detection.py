@@ -0,0 +1,77 @@
+"""
+Script-based language detection
+
+Every supported language has its own Unicode block, so counting codepoints
+per block identifies the language in one vectorized pass over the text. Only
+Latin (romanized) or genuinely mixed-script text needs a statistical detector.
+"""
+
+import os
+from typing import Dict, Optional
+
+import numpy as np
+
+# Share of the Indic letters the top script needs to decide on its own
+SCRIPT_DOMINANCE = float(os.getenv("SCRIPT_DOMINANCE", "0.8"))
+
+# Block boundaries, in ascending order; odd-numbered bins are the blocks
+SCRIPT_BLOCKS = (
+    ("hindi", 0x0900, 0x0980),  # Devanagari
+    ("tamil", 0x0B80, 0x0C00),
+    ("telugu", 0x0C00, 0x0C80),
+    ("kannada", 0x0C80, 0x0D00),
+)
+
+_EDGES = np.array(
+    sorted({edge for _, start, end in SCRIPT_BLOCKS for edge in (start, end)}),
+    dtype=np.uint32,
+)
+_BIN_FOR = {
+    language: int(np.searchsorted(_EDGES, start, side="right"))
+    for language, start, _ in SCRIPT_BLOCKS
+}
+
+
+def script_counts(text: str) -> Dict[str, int]:
+    """Codepoints per supported script, plus Latin letters under "latin" """
+    codepoints = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+
+    bins = np.bincount(
+        np.searchsorted(_EDGES, codepoints, side="right"), minlength=len(_EDGES) + 1
+    )
+    counts = {language: int(bins[index]) for language, index in _BIN_FOR.items()}
+
+    # ASCII letters and Latin-1/Extended-A/B letters
+    lowered = codepoints | 0x20
+    counts["latin"] = int(
+        np.count_nonzero((lowered >= 0x61) & (lowered <= 0x7A))
+        + np.count_nonzero((codepoints >= 0x00C0) & (codepoints <= 0x024F))
+    )
+    return counts
+
+
+def dominant_script(
+    counts: Dict[str, int], dominance: float = SCRIPT_DOMINANCE
+) -> Optional[str]:
+    """
+    Language whose script clearly dominates, or None when the text is mostly
+    Latin, has no supported script, or mixes scripts
+    """
+    indic = {
+        language: count for language, count in counts.items() if language != "latin"
+    }
+    total = sum(indic.values())
+    if not total or counts.get("latin", 0) > total:
+        return None
+
+    language = max(indic, key=indic.get)
+    return language if indic[language] >= dominance * total else None
+
+
+def most_common_script(counts: Dict[str, int]) -> Optional[str]:
+    """Language with the most codepoints in its script, if any"""
+    indic = {
+        language: count for language, count in counts.items() if language != "latin"
+    }
+    language = max(indic, key=indic.get)
+    return language if indic[language] else None
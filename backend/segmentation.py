@@ -0,0 +1,45 @@
+"""
+Script-aware sentence segmentation for long documents
+
+Splits on the Devanagari danda and double danda ("।", "॥"), on Latin sentence
+punctuation (which Tamil, Telugu and Kannada text uses) and on line breaks.
+Latin punctuation only ends a sentence when followed by whitespace or the end
+of the text, so decimals and dotted abbreviations inside a word stay intact.
+"""
+
+import re
+from typing import List, NamedTuple
+
+# Sentence end: dandas anywhere, or . ! ? before whitespace/end, plus any
+# closing quotes or brackets; a line break always ends a sentence. An ASCII
+# "|" is not a danda: it appears in tables, code and "A|B" alternatives
+_BOUNDARY = re.compile(r"(?:[।॥]+|[.!?…]+(?=[\s\"'”’)\]]|$))[\"'”’)\]]*|\n")
+
+# A fragment must contain at least one letter or digit to count as a sentence
+_WORD = re.compile(r"\w")
+
+
+class Sentence(NamedTuple):
+    text: str
+    start: int  # character offsets into the original document
+    end: int
+
+
+def split_sentences(text: str) -> List[Sentence]:
+    """Split a document into sentences with their character offsets"""
+    sentences = []
+    start = 0
+
+    def add(begin: int, end: int):
+        chunk = text[begin:end]
+        stripped = chunk.strip()
+        if stripped and _WORD.search(stripped):
+            offset = begin + (len(chunk) - len(chunk.lstrip()))
+            sentences.append(Sentence(stripped, offset, offset + len(stripped)))
+
+    for match in _BOUNDARY.finditer(text):
+        add(start, match.end())
+        start = match.end()
+    add(start, len(text))
+
+    return sentences
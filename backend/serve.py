@@ -0,0 +1,184 @@
+"""
+Pre-fork multi-worker server
+
+Loads the models once in a parent process, then forks N uvicorn workers that
+share one listening socket. Workers inherit the model weights through
+copy-on-write pages (or, with --share-memory, through shared-memory tensors)
+instead of each loading their own copy, and each worker pins its torch thread
+count to its share of the cores.
+
+Forking a process whose OpenMP/torch thread pools are already running can
+deadlock the children. Model loading in the parent can run forward passes
+(int8 parity checks, ONNX export), so the parent keeps torch single-threaded,
+which starts no pool, and each worker sets its own thread count after the
+fork. ONNX Runtime sessions are created in the parent and keep their thread
+pool for life, so under serve.py they run single-threaded; scale with workers.
+
+Usage:
+    python serve.py --workers 4 --port 8000
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+import engines
+import executor
+import main as app_module
+import torch
+import uvicorn
+
+logger = logging.getLogger("serve")
+
+# Serving configuration
+SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", str(os.cpu_count() or 1)))
+SERVE_SHARE_MEMORY = os.getenv("SERVE_SHARE_MEMORY", "false").lower() == "true"
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    """Create the listening socket all workers accept on"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def restrict_parent_threads():
+    """Keep the parent from starting thread pools that forked children inherit broken"""
+    torch.set_num_threads(1)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Only settable before any inter-op work; nothing has started yet if this fails
+        pass
+
+    if engines.INFERENCE_ENGINE == "onnx":
+        if engines.ONNX_INTRA_OP_THREADS != 1:
+            logger.warning(
+                "ONNX sessions are created before fork, so each worker runs them "
+                "single-threaded"
+            )
+        engines.ONNX_INTRA_OP_THREADS = 1
+
+
+def preload_models(share_memory: bool):
+    """Load every language model once, before forking"""
+    restrict_parent_threads()
+    app_module.model_registry.set_available(app_module.available_languages())
+    app_module.load_models()
+
+    if share_memory:
+        # Move weights into shared memory so they stay shared even if touched
+        for lang, model in app_module.models.items():
+            if isinstance(model, torch.nn.Module):
+                model.share_memory()
+                logger.info(f"✓ Moved {lang} weights to shared memory")
+
+    # Keep the GC from writing to (and so un-sharing) every preloaded object
+    gc.collect()
+    gc.freeze()
+
+
+def run_worker(index: int, sock: socket.socket, args):
+    """Body of a forked worker process; never returns"""
+    threads = args.torch_threads or max(1, (os.cpu_count() or 1) // args.workers)
+    # The parent ran single-threaded; this worker's pool starts fresh after the fork
+    executor.TORCH_NUM_THREADS = threads
+    executor.configure_torch_threads(threads)
+
+    logger.info(
+        f"Worker {index} (pid {os.getpid()}) starting with {threads} torch threads"
+    )
+
+    config = uvicorn.Config(app_module.app, log_level=args.log_level)
+    server = uvicorn.Server(config)
+    try:
+        server.run(sockets=[sock])
+    finally:
+        os._exit(0)
+
+
+def spawn_worker(index: int, sock: socket.socket, args) -> int:
+    pid = os.fork()
+    if pid == 0:
+        run_worker(index, sock, args)
+    return pid
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Pre-fork multi-worker API server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=SERVE_WORKERS)
+    parser.add_argument(
+        "--torch-threads",
+        type=int,
+        default=0,
+        help="Torch threads per worker (default: cores / workers)",
+    )
+    parser.add_argument(
+        "--share-memory",
+        action="store_true",
+        default=SERVE_SHARE_MEMORY,
+        help="Place model weights in shared memory instead of relying on copy-on-write",
+    )
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    logger.info(f"Pre-fork server: loading models once for {args.workers} workers")
+    preload_models(args.share_memory)
+    sock = bind_socket(args.host, args.port)
+
+    children = {}
+    for index in range(args.workers):
+        children[spawn_worker(index, sock, args)] = index
+
+    stopping = False
+
+    def handle_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, handle_stop)
+    signal.signal(signal.SIGINT, handle_stop)
+
+    logger.info(
+        f"✓ Serving on http://{args.host}:{args.port} with {args.workers} workers"
+    )
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+
+        index = children.pop(pid, None)
+        if index is None or stopping:
+            continue
+
+        # Replace crashed workers; back off briefly so a crash loop doesn't spin
+        logger.warning(
+            f"Worker {index} (pid {pid}) exited with status {status}, restarting"
+        )
+        time.sleep(1)
+        children[spawn_worker(index, sock, args)] = index
+
+    sock.close()
+    logger.info("✓ All workers stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
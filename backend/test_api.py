@@ -3,17 +3,20 @@ Simple API testing script for the Metaphor Detection backend
 Run this after starting the backend server to verify all endpoints work
 """
 
-import requests
 import json
-from typing import Dict, Any
+from typing import Any, Dict
+
+import requests
 
 BASE_URL = "http://localhost:8000"
 
+
 def print_section(title: str):
     """Print a formatted section header"""
-    print("\n" + "="*60)
+    print("\n" + "=" * 60)
     print(f"  {title}")
-    print("="*60)
+    print("=" * 60)
+
 
 def print_response(response: requests.Response):
     """Print formatted response"""
@@ -24,6 +27,7 @@ def print_response(response: requests.Response):
     except:
         print(f"Response: {response.text}")
 
+
 def test_health_check():
     """Test the health check endpoint"""
     print_section("Testing Health Check Endpoint")
@@ -35,6 +39,7 @@ def test_health_check():
         print(f"❌ Error: {e}")
         return False
 
+
 def test_prediction(text: str, expected_language: str):
     """Test the prediction endpoint"""
     print_section(f"Testing Prediction: {text[:50]}...")
@@ -43,20 +48,20 @@ def test_prediction(text: str, expected_language: str):
         response = requests.post(
             f"{BASE_URL}/predict",
             json=payload,
-            headers={"Content-Type": "application/json"}
+            headers={"Content-Type": "application/json"},
         )
         print_response(response)
-        
+
         if response.status_code == 200:
             data = response.json()
             detected_lang = data.get("language")
             label = data.get("label")
             confidence = data.get("confidence")
-            
+
             print(f"\n✅ Detected Language: {detected_lang}")
             print(f"✅ Label: {label}")
             print(f"✅ Confidence: {confidence:.2%}")
-            
+
             if detected_lang == expected_language:
                 print(f"✅ Language detection correct!")
                 return True
@@ -66,23 +71,21 @@ def test_prediction(text: str, expected_language: str):
         else:
             print(f"❌ Request failed")
             return False
-            
+
     except Exception as e:
         print(f"❌ Error: {e}")
         return False
 
+
 def test_translation(text: str, language: str):
     """Test the translation endpoint"""
     print_section(f"Testing Translation: {text[:50]}...")
     try:
-        payload = {
-            "text": text,
-            "source_language": language
-        }
+        payload = {"text": text, "source_language": language}
         response = requests.post(
             f"{BASE_URL}/translate",
             json=payload,
-            headers={"Content-Type": "application/json"}
+            headers={"Content-Type": "application/json"},
         )
         print_response(response)
         return response.status_code == 200
@@ -90,6 +93,109 @@ def test_translation(text: str, language: str):
         print(f"❌ Error: {e}")
         return False
 
+
+def test_batch_prediction():
+    """Test the bulk prediction endpoint"""
+    print_section("Testing Batch Prediction")
+    try:
+        payload = {
+            "texts": [
+                "वह आसमान छू रहा है",
+                "",
+                "அவன் வானத்தை தொடுகிறான்",
+                "ನಾನು ಶಾಲೆಗೆ ಹೋಗುತ್ತಿದ್ದೇನೆ",
+            ]
+        }
+        response = requests.post(
+            f"{BASE_URL}/predict/batch",
+            json=payload,
+            headers={"Content-Type": "application/json"},
+        )
+        print_response(response)
+
+        if response.status_code != 200:
+            print("❌ Request failed")
+            return False
+
+        data = response.json()
+        indices = [item["index"] for item in data["results"]]
+        if indices != list(range(len(payload["texts"]))):
+            print("⚠️  Results are not in input order")
+            return False
+        if data["results"][1]["error"] is None:
+            print("⚠️  Empty item should carry a per-item error")
+            return False
+
+        print(
+            f"✅ {data['succeeded']}/{data['count']} items scored, empty item rejected "
+            "individually"
+        )
+        return True
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+
+def test_stream_prediction():
+    """Test the NDJSON streaming endpoint"""
+    print_section("Testing Stream Prediction")
+    try:
+        lines = [
+            "वह आसमान छू रहा है",
+            "அவன் வானத்தை தொடுகிறான்",
+            "ನಾನು ಶಾಲೆಗೆ ಹೋಗುತ್ತಿದ್ದೇನೆ",
+        ]
+        response = requests.post(
+            f"{BASE_URL}/predict/stream",
+            data="\n".join(lines).encode("utf-8"),
+            stream=True,
+        )
+        print(f"Status Code: {response.status_code}")
+
+        results = [json.loads(line) for line in response.iter_lines() if line]
+        for result in results:
+            print(json.dumps(result, ensure_ascii=False))
+
+        if [r["index"] for r in results] != list(range(len(lines))):
+            print("⚠️  Expected one result per line, in input order")
+            return False
+
+        print(f"✅ Streamed {len(results)} results")
+        return True
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+
+def test_document_prediction():
+    """Test sentence-level scoring of a multi-sentence document"""
+    print_section("Testing Document Prediction")
+    try:
+        payload = {
+            "text": "वह आसमान छू रहा है। उसका दिल पत्थर का है। हम कल बाज़ार गए थे।"
+        }
+        response = requests.post(
+            f"{BASE_URL}/predict/document",
+            json=payload,
+            headers={"Content-Type": "application/json"},
+        )
+        print_response(response)
+
+        if response.status_code != 200:
+            return False
+
+        data = response.json()
+        if data["summary"]["sentence_count"] != 3:
+            print("⚠️  Expected the document to be split into 3 sentences")
+            return False
+
+        print(f"✅ Scored {data['summary']['scored']} sentences")
+        return True
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+
 def test_empty_input():
     """Test error handling with empty input"""
     print_section("Testing Empty Input (Error Handling)")
@@ -98,10 +204,10 @@ def test_empty_input():
         response = requests.post(
             f"{BASE_URL}/predict",
             json=payload,
-            headers={"Content-Type": "application/json"}
+            headers={"Content-Type": "application/json"},
         )
         print_response(response)
-        
+
         if response.status_code == 400:
             print("✅ Correctly rejected empty input")
             return True
@@ -112,6 +218,7 @@ def test_empty_input():
         print(f"❌ Error: {e}")
         return False
 
+
 def test_unsupported_language():
     """Test error handling with unsupported language"""
     print_section("Testing Unsupported Language (Error Handling)")
@@ -120,10 +227,10 @@ def test_unsupported_language():
         response = requests.post(
             f"{BASE_URL}/predict",
             json=payload,
-            headers={"Content-Type": "application/json"}
+            headers={"Content-Type": "application/json"},
         )
         print_response(response)
-        
+
         if response.status_code == 400:
             print("✅ Correctly rejected unsupported language")
             return True
@@ -134,95 +241,87 @@ def test_unsupported_language():
         print(f"❌ Error: {e}")
         return False
 
+
 def run_all_tests():
     """Run all API tests"""
-    print("\n" + "🚀"*30)
+    print("\n" + "🚀" * 30)
     print("  METAPHOR DETECTION API TEST SUITE")
-    print("🚀"*30)
-    
+    print("🚀" * 30)
+
     results = []
-    
+
     # Test 1: Health Check
     results.append(("Health Check", test_health_check()))
-    
+
     # Test 2: Hindi Metaphor
-    results.append((
-        "Hindi Metaphor",
-        test_prediction("वह आसमान छू रहा है", "hindi")
-    ))
-    
+    results.append(("Hindi Metaphor", test_prediction("वह आसमान छू रहा है", "hindi")))
+
     # Test 3: Hindi Normal
-    results.append((
-        "Hindi Normal",
-        test_prediction("मैं स्कूल जा रहा हूं", "hindi")
-    ))
-    
+    results.append(("Hindi Normal", test_prediction("मैं स्कूल जा रहा हूं", "hindi")))
+
     # Test 4: Tamil Metaphor
-    results.append((
-        "Tamil Metaphor",
-        test_prediction("அவன் வானத்தை தொடுகிறான்", "tamil")
-    ))
-    
+    results.append(
+        ("Tamil Metaphor", test_prediction("அவன் வானத்தை தொடுகிறான்", "tamil"))
+    )
+
     # Test 5: Tamil Normal
-    results.append((
-        "Tamil Normal",
-        test_prediction("நான் பள்ளிக்கு செல்கிறேன்", "tamil")
-    ))
-    
+    results.append(
+        ("Tamil Normal", test_prediction("நான் பள்ளிக்கு செல்கிறேன்", "tamil"))
+    )
+
     # Test 6: Kannada Metaphor
-    results.append((
-        "Kannada Metaphor",
-        test_prediction("ಅವನು ಬೆಂಕಿಯಂತೆ ಕೋಪಗೊಂಡನು", "kannada")
-    ))
-    
+    results.append(
+        ("Kannada Metaphor", test_prediction("ಅವನು ಬೆಂಕಿಯಂತೆ ಕೋಪಗೊಂಡನು", "kannada"))
+    )
+
     # Test 7: Kannada Normal
-    results.append((
-        "Kannada Normal",
-        test_prediction("ನಾನು ಶಾಲೆಗೆ ಹೋಗುತ್ತಿದ್ದೇನೆ", "kannada")
-    ))
-    
+    results.append(
+        ("Kannada Normal", test_prediction("ನಾನು ಶಾಲೆಗೆ ಹೋಗುತ್ತಿದ್ದೇನೆ", "kannada"))
+    )
+
     # Test 8: Translation
-    results.append((
-        "Translation",
-        test_translation("वह आसमान छू रहा है", "hindi")
-    ))
-    
-    # Test 9: Empty Input
-    results.append((
-        "Empty Input Error",
-        test_empty_input()
-    ))
-    
-    # Test 10: Unsupported Language
-    results.append((
-        "Unsupported Language Error",
-        test_unsupported_language()
-    ))
-    
+    results.append(("Translation", test_translation("वह आसमान छू रहा है", "hindi")))
+
+    # Test 9: Batch Prediction
+    results.append(("Batch Prediction", test_batch_prediction()))
+
+    # Test 10: Stream Prediction
+    results.append(("Stream Prediction", test_stream_prediction()))
+
+    # Test 11: Document Prediction
+    results.append(("Document Prediction", test_document_prediction()))
+
+    # Test 12: Empty Input
+    results.append(("Empty Input Error", test_empty_input()))
+
+    # Test 13: Unsupported Language
+    results.append(("Unsupported Language Error", test_unsupported_language()))
+
     # Print Summary
     print_section("TEST SUMMARY")
     passed = sum(1 for _, result in results if result)
     total = len(results)
-    
+
     for test_name, result in results:
         status = "✅ PASS" if result else "❌ FAIL"
         print(f"{status}: {test_name}")
-    
+
     print(f"\n{'='*60}")
     print(f"  Results: {passed}/{total} tests passed ({passed/total*100:.1f}%)")
     print(f"{'='*60}\n")
-    
+
     if passed == total:
         print("🎉 All tests passed! Your API is working correctly.")
     else:
         print("⚠️  Some tests failed. Check the output above for details.")
 
+
 if __name__ == "__main__":
     print("\n⚠️  Make sure the backend server is running on http://localhost:8000")
     print("   Start it with: uvicorn main:app --reload\n")
-    
+
     input("Press Enter to start testing...")
-    
+
     try:
         run_all_tests()
     except KeyboardInterrupt:
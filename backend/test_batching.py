@@ -0,0 +1,46 @@
+"""
+Offline tests for length bucketing used by /predict/batch
+Run with: pytest test_batching.py
+"""
+
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from batching import length_buckets  # noqa: E402
+
+
+def test_buckets_group_similar_lengths():
+    lengths = [40, 3, 17, 3, 90, 12, 55, 8]
+    buckets = length_buckets(lengths, bucket_size=3)
+
+    assert [len(bucket) for bucket in buckets] == [3, 3, 2]
+    ordered = [lengths[i] for bucket in buckets for i in bucket]
+    assert ordered == sorted(lengths)
+
+
+def test_equal_lengths_keep_input_order():
+    assert length_buckets([5, 5, 5, 5], bucket_size=2) == [[0, 1], [2, 3]]
+
+
+def test_indices_round_trip_to_input_order():
+    random.seed(7)
+    texts = ["x" * random.randint(1, 200) + f"#{i}" for i in range(101)]
+    buckets = length_buckets([len(text) for text in texts], bucket_size=16)
+
+    indices = [i for bucket in buckets for i in bucket]
+    assert sorted(indices) == list(range(len(texts)))
+
+    # Results produced bucket by bucket land back in their input slots
+    results = [None] * len(texts)
+    for bucket in buckets:
+        for i in bucket:
+            results[i] = texts[i].upper()
+    assert results == [text.upper() for text in texts]
+
+
+def test_degenerate_inputs():
+    assert length_buckets([], bucket_size=4) == []
+    assert length_buckets([3, 1, 2], bucket_size=0) == [[1], [2], [0]]
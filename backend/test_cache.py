@@ -0,0 +1,172 @@
+"""
+Offline tests for cache keys, the in-memory result cache and request coalescing
+Run with: pytest test_cache.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import cache  # noqa: E402
+from cache import TTLCache  # noqa: E402
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time() for the cache module"""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(cache, "time", SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+def test_entries_expire_after_their_ttl(clock):
+    results = TTLCache("test", default_ttl=60)
+    results.set("default", "a")
+    results.set("short", "b", ttl=5)
+
+    clock.value += 10
+    assert results.get("short") is None
+    assert results.get("default") == "a"
+
+    clock.value += 60
+    assert results.get("default") is None
+    assert results.expirations == 2
+    assert len(results) == 0 and results.bytes == 0
+
+
+def test_sweep_drops_only_expired_entries(clock):
+    results = TTLCache("test", default_ttl=60)
+    results.set("old", "a", ttl=1)
+    results.set("new", "b")
+
+    clock.value += 2
+    assert results.sweep() == 1
+    assert len(results) == 1
+    assert results.get("new") == "b"
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    results = TTLCache("test", max_entries=2, max_bytes=0)
+    results.set("a", 1)
+    results.set("b", 2)
+    assert results.get("a") == 1  # "b" is now least recently used
+
+    results.set("c", 3)
+    assert results.get("b") is None
+    assert results.get("a") == 1 and results.get("c") == 3
+    assert results.evictions == 1
+
+
+def test_byte_cap_evicts_and_rejects_oversized_values(clock):
+    value = "x" * 98  # 100 bytes as JSON
+    results = TTLCache("test", max_entries=100, max_bytes=250)
+    results.set("a", value)
+    results.set("b", value)
+    results.set("c", value)
+
+    assert results.get("a") is None
+    assert results.bytes == 200
+
+    results.set("huge", "x" * 1000)
+    assert results.get("huge") is None
+    assert results.get("b") == value and results.get("c") == value
+
+
+def test_overwriting_a_key_updates_its_size(clock):
+    results = TTLCache("test")
+    results.set("a", "x" * 98)
+    results.set("a", "x")
+
+    assert len(results) == 1
+    assert results.bytes == cache.estimate_size("x")
+
+
+def test_canonical_text_merges_equivalent_inputs():
+    composed = "அவன் கொடுத்தான்"
+    decomposed = composed.replace("\u0bca", "\u0bc6\u0bbe")
+    assert decomposed != composed
+    assert cache.canonical_text(decomposed) == cache.canonical_text(composed)
+
+    variants = [
+        "वह शेर है",
+        "वह शेर है।",
+        "वह शेर है ।",
+        "वह शेर है॥",
+        "  वह   शेर\tहै!! ",
+        "वह\u200b शेर\u200d है",
+        "\ufeffवह शेर है...",
+    ]
+    assert {cache.canonical_text(text) for text in variants} == {"वह शेर है"}
+
+
+def test_canonical_text_keeps_meaningful_differences():
+    assert cache.canonical_text("वह शेर है") != cache.canonical_text("वह शेर था")
+    assert cache.canonical_text("Life is a journey") != cache.canonical_text(
+        "life is a journey"
+    )
+    # Only trailing punctuation goes; inner punctuation is part of the text
+    assert cache.canonical_text("Yes, he is. No!") == "Yes, he is. No"
+
+
+def test_single_flight_coalesces_concurrent_callers():
+    async def run():
+        flight = cache.SingleFlight()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"label": "metaphor"}
+
+        results = await asyncio.gather(*(flight.do("key", compute) for _ in range(10)))
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        assert flight.stats() == {"in_flight": 0, "computed": 1, "coalesced": 9}
+
+        # Once finished the key is free, so a later call computes again
+        await flight.do("key", compute)
+        assert len(calls) == 2
+
+    asyncio.run(run())
+
+
+def test_single_flight_shares_errors_with_every_caller():
+    async def run():
+        flight = cache.SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("model unavailable")
+
+        results = await asyncio.gather(
+            *(flight.do("key", fail) for _ in range(3)), return_exceptions=True
+        )
+        assert [type(result) for result in results] == [ValueError] * 3
+        assert flight.stats()["in_flight"] == 0
+
+    asyncio.run(run())
+
+
+def test_single_flight_survives_a_cancelled_caller():
+    async def run():
+        flight = cache.SingleFlight()
+
+        async def compute():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        leader = asyncio.create_task(flight.do("key", compute))
+        follower = asyncio.create_task(flight.do("key", compute))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        assert await follower == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+    asyncio.run(run())
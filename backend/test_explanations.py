@@ -0,0 +1,69 @@
+"""
+Offline tests for parsing batched Gemini explanation responses
+Run with: pytest test_explanations.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from explanations import build_batch_prompt, parse_batch_response  # noqa: E402
+
+
+def test_json_array_with_ids():
+    raw = (
+        '[{"id": 2, "explanation": "It compares time to money."},'
+        ' {"id": 1, "explanation": "This metaphor compares him to a lion."}]'
+    )
+    assert parse_batch_response(raw, 2) == {
+        1: "This metaphor compares him to a lion.",
+        2: "It compares time to money.",
+    }
+
+
+def test_json_array_inside_code_fence():
+    raw = '```json\n[{"id": 1, "explanation": "First."}, "Second."]\n```'
+    assert parse_batch_response(raw, 2) == {1: "First.", 2: "Second."}
+
+
+def test_json_items_out_of_range_or_empty_are_left_out():
+    raw = (
+        '[{"id": 1, "explanation": "  "}, {"id": 2, "explanation": "Kept."},'
+        ' {"id": 7, "explanation": "Unknown item."}, {"id": "3", "explanation": "x"}]'
+    )
+    assert parse_batch_response(raw, 3) == {2: "Kept."}
+
+
+def test_numbered_list_with_continuation_lines():
+    raw = (
+        "Here are the explanations:\n"
+        "1. This metaphor compares life\n"
+        "   to a journey.\n"
+        "2) It compares time to money.\n"
+        "\n"
+        "4: Out of range.\n"
+        "3:\n"
+        "Explanation on the next line."
+    )
+    assert parse_batch_response(raw, 3) == {
+        1: "This metaphor compares life to a journey.",
+        2: "It compares time to money.",
+        3: "Explanation on the next line.",
+    }
+
+
+def test_malformed_json_falls_back_to_numbered_list():
+    raw = '[{"id": 1, "explanation": "cut off\n1. Listed instead.'
+    assert parse_batch_response(raw, 1) == {1: "Listed instead."}
+
+
+def test_unparseable_response_yields_nothing():
+    assert parse_batch_response("Sorry, I can't help with that.", 2) == {}
+    assert parse_batch_response("", 2) == {}
+
+
+def test_batch_prompt_numbers_items_in_order():
+    prompt = build_batch_prompt([("वह शेर है", "hindi"), ("அவள் ஒரு பூ", "tamil")])
+    assert '1. [hindi] "वह शेर है"' in prompt
+    assert '2. [tamil] "அவள் ஒரு பூ"' in prompt
@@ -0,0 +1,94 @@
+"""
+Offline tests for the SQLite persistent cache tier
+Run with: pytest test_persistent_cache.py
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import persistent_cache  # noqa: E402
+from cache import TTLCache  # noqa: E402
+from persistent_cache import PersistentCache  # noqa: E402
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time() for the persistent cache module"""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(
+        persistent_cache, "time", SimpleNamespace(time=lambda: now.value)
+    )
+    return now
+
+
+def test_round_trip_expiry_and_namespaces(tmp_path, clock):
+    store = PersistentCache(tmp_path / "results.sqlite3")
+    store.set("prediction:a", "key", {"label": "metaphor"}, expires_at=1100)
+    store.set("prediction:b", "key", {"label": "normal"}, expires_at=1100)
+
+    assert store.get("prediction:a", "key") == ({"label": "metaphor"}, 1100)
+    assert store.get("prediction:b", "key") == ({"label": "normal"}, 1100)
+    assert store.get("prediction:c", "key") is None
+
+    clock.value = 1100
+    assert store.get("prediction:a", "key") is None
+    assert store.sweep() == 2
+    assert store.stats()["entries"] == 0
+
+
+def test_size_cap_deletes_least_recently_used_rows(tmp_path, clock):
+    value = "x" * 98  # 100 bytes as JSON
+    store = PersistentCache(tmp_path / "results.sqlite3", max_mb=1000 / 1024 / 1024)
+    for i in range(10):
+        clock.value += 1
+        store.set("ns", f"key{i}", value, expires_at=1_000_000)
+
+    # An old row read after TOUCH_INTERVAL counts as recently used again
+    clock.value += persistent_cache.TOUCH_INTERVAL + 1
+    assert store.get("ns", "key0") is not None
+
+    store.set("ns", "key10", value, expires_at=1_000_000)
+    store.enforce_size()
+
+    assert store.size_bytes() <= 900
+    assert store.evictions == 2
+    kept = [i for i in range(11) if store.get("ns", f"key{i}") is not None]
+    assert kept == [0, 3, 4, 5, 6, 7, 8, 9, 10]
+
+
+def test_locked_database_is_skipped_not_raised(tmp_path, clock):
+    path = tmp_path / "results.sqlite3"
+    store = PersistentCache(path)
+    store.set("ns", "key", "old", expires_at=2000)
+
+    other_worker = sqlite3.connect(str(path), isolation_level=None)
+    other_worker.execute("BEGIN EXCLUSIVE")
+    try:
+        store.set("ns", "key", "new", expires_at=2000)
+        assert store.busy == 1 and store.errors == 0
+    finally:
+        other_worker.execute("ROLLBACK")
+        other_worker.close()
+
+    assert store.get("ns", "key") == ("old", 2000)
+
+
+def test_memory_cache_reads_and_writes_through(tmp_path):
+    store = PersistentCache(tmp_path / "results.sqlite3")
+    first_worker = TTLCache("prediction", backing=store, namespace="prediction:v1")
+    second_worker = TTLCache("prediction", backing=store, namespace="prediction:v1")
+    other_model = TTLCache("prediction", backing=store, namespace="prediction:v2")
+
+    first_worker.set("key", {"label": "metaphor"})
+
+    assert second_worker.get("key") == {"label": "metaphor"}
+    assert second_worker.backing_hits == 1
+    assert second_worker.get("key") == {"label": "metaphor"}
+    assert second_worker.hits == 1
+    assert other_model.get("key") is None
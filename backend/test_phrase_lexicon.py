@@ -0,0 +1,77 @@
+"""
+Offline tests for the metaphor phrase lexicon
+Run with: pytest test_phrase_lexicon.py
+"""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from phrase_lexicon import (  # noqa: E402
+    PhraseAutomaton,
+    PhraseLexicon,
+    read_lexicon_file,
+)
+
+
+def automaton(*phrases: str) -> PhraseAutomaton:
+    return PhraseAutomaton({phrase: phrase.upper() for phrase in phrases})
+
+
+def test_longest_phrase_wins():
+    lexicon = automaton("दिल", "दिल का", "दिल का दर्द", "दर्द")
+    assert lexicon.longest_match("उसके दिल का दर्द गहरा है") == "दिल का दर्द"
+    assert lexicon.longest_match("दिल का हाल") == "दिल का"
+
+
+def test_match_found_through_failure_links():
+    # "abcx" is a dead end at "d"; the automaton must fall back to find "bcd"
+    lexicon = automaton("abcx", "bcd", "c")
+    assert lexicon.longest_match("zabcdz") == "bcd"
+    assert lexicon.longest_match("abcabcx") == "abcx"
+
+
+def test_earliest_phrase_wins_ties_and_misses_return_none():
+    lexicon = automaton("sea", "sky")
+    assert lexicon.longest_match("sky and sea") == "sky"
+    assert lexicon.longest_match("the ocean") is None
+    assert automaton().longest_match("anything") is None
+
+
+def test_read_lexicon_file_skips_comments_and_malformed_lines(tmp_path):
+    path = tmp_path / "hindi.tsv"
+    path.write_text(
+        "# phrase<TAB>translation\n"
+        "\n"
+        "दिल का दर्द\tPain of the heart\n"
+        "no translation\n"
+        "\tno phrase\n"
+        "समय पैसा है\tTime is money\n",
+        encoding="utf-8",
+    )
+    assert read_lexicon_file(path) == {
+        "दिल का दर्द": "Pain of the heart",
+        "समय पैसा है": "Time is money",
+    }
+
+
+def test_lookup_normalizes_text_and_reloads_changed_files(tmp_path):
+    path = tmp_path / "tamil.tsv"
+    path.write_text("கொடுத்தான்\tgave\n", encoding="utf-8")
+    lexicon = PhraseLexicon(tmp_path, reload_interval=0)
+    lexicon.load()
+
+    decomposed = "அவன் கொடுத்தான்".replace("\u0bca", "\u0bc6\u0bbe")
+    assert decomposed != "அவன் கொடுத்தான்"
+    assert lexicon.lookup("tamil", decomposed) == ("கொடுத்தான்", "gave")
+    assert lexicon.lookup("hindi", decomposed) is None
+
+    path.write_text("கொடுத்தான்\thanded over\n", encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    lexicon.load()
+
+    assert lexicon.lookup("tamil", "அவன் கொடுத்தான்") == ("கொடுத்தான்", "handed over")
+    assert lexicon.reloads == 1
@@ -0,0 +1,73 @@
+"""
+Offline tests for script-based language detection
+Run with: pytest test_script_detection.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from script_detection import (  # noqa: E402
+    dominant_script,
+    most_common_script,
+    script_counts,
+)
+
+
+def test_block_edges_land_in_the_right_bins():
+    text = "".join(
+        chr(codepoint)
+        for codepoint in (
+            0x0900,  # first Devanagari
+            0x097F,  # last Devanagari
+            0x0980,  # Bengali: not supported
+            0x0B80,  # first Tamil
+            0x0BFF,  # last Tamil
+            0x0C00,  # first Telugu
+            0x0C7F,  # last Telugu
+            0x0C80,  # first Kannada
+            0x0CFF,  # last Kannada
+            0x0D00,  # Malayalam: not supported
+        )
+    )
+    assert script_counts(text) == {
+        "hindi": 2,
+        "tamil": 2,
+        "telugu": 2,
+        "kannada": 2,
+        "latin": 0,
+    }
+
+
+def test_latin_letters_are_counted_separately():
+    counts = script_counts("Naïve café, 42 [ok] @ home!")
+    assert counts["latin"] == 15
+    assert counts["hindi"] == counts["tamil"] == 0
+
+
+def test_counts_for_each_language():
+    samples = {
+        "hindi": "वह शेर है",
+        "tamil": "அவன் ஒரு சிங்கம்",
+        "telugu": "అతను సింహం",
+        "kannada": "ಅವನು ಸಿಂಹ",
+    }
+    for language, text in samples.items():
+        counts = script_counts(text)
+        letters = len(text.replace(" ", ""))
+        assert counts[language] == letters
+        assert sum(counts.values()) == letters
+
+
+def test_dominant_script_needs_a_clear_majority():
+    assert dominant_script(script_counts("वह शेर है")) == "hindi"
+    assert dominant_script(script_counts("वह शेर है OK")) == "hindi"
+    assert dominant_script(script_counts("vah sher hai")) is None
+    assert dominant_script(script_counts("वह शेर அவன் ஒரு")) is None
+    assert dominant_script(script_counts("12345")) is None
+
+
+def test_most_common_script():
+    assert most_common_script(script_counts("वह शेर அவன் ஒரு சிங்கம்")) == "tamil"
+    assert most_common_script(script_counts("only latin")) is None
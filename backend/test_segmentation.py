@@ -0,0 +1,74 @@
+"""
+Offline tests for sentence segmentation used by /predict/document
+Run with: pytest test_segmentation.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from segmentation import split_sentences  # noqa: E402
+
+
+def assert_offsets(text: str, sentences):
+    for sentence in sentences:
+        assert text[sentence.start : sentence.end] == sentence.text
+
+
+def test_danda_and_double_danda():
+    text = "वह शेर है। समय पैसा है॥ जीवन एक यात्रा है"
+    sentences = split_sentences(text)
+
+    assert [s.text for s in sentences] == [
+        "वह शेर है।",
+        "समय पैसा है॥",
+        "जीवन एक यात्रा है",
+    ]
+    assert_offsets(text, sentences)
+
+
+def test_latin_punctuation_needs_following_space():
+    text = "அவன் ஒரு சிங்கம். Price is 3.5 today! e.g.this stays? Yes"
+    sentences = split_sentences(text)
+
+    assert [s.text for s in sentences] == [
+        "அவன் ஒரு சிங்கம்.",
+        "Price is 3.5 today!",
+        "e.g.this stays?",
+        "Yes",
+    ]
+    assert_offsets(text, sentences)
+
+
+def test_closing_quotes_stay_with_their_sentence():
+    text = 'He said "life is a journey." Then he left.'
+    sentences = split_sentences(text)
+
+    assert [s.text for s in sentences] == [
+        'He said "life is a journey."',
+        "Then he left.",
+    ]
+    assert_offsets(text, sentences)
+
+
+def test_offsets_skip_surrounding_whitespace_and_line_breaks():
+    text = "  first line\n\n   second line.   \n…\n third"
+    sentences = split_sentences(text)
+
+    assert [s.text for s in sentences] == ["first line", "second line.", "third"]
+    assert [s.start for s in sentences] == [2, 17, 36]
+    assert_offsets(text, sentences)
+
+
+def test_fragments_without_words_are_dropped():
+    assert split_sentences("") == []
+    assert split_sentences(" ... !!! ।। \n") == []
+
+
+def test_ascii_pipe_is_not_a_boundary():
+    text = "Choose A|B here. | col1 | col2 |"
+    sentences = split_sentences(text)
+
+    assert [s.text for s in sentences] == ["Choose A|B here.", "| col1 | col2 |"]
+    assert_offsets(text, sentences)
@@ -0,0 +1,74 @@
+"""
+Offline tests for the NDJSON line reader behind /predict/stream
+Run with: pytest test_streaming.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import main  # noqa: E402
+
+
+class ChunkedRequest:
+    """Stands in for a starlette Request whose body arrives in the given chunks"""
+
+    def __init__(self, *chunks: bytes):
+        self.chunks = chunks
+
+    async def stream(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+def read_lines(*chunks: bytes) -> list:
+    async def collect():
+        return [line async for line in main.read_stream_lines(ChunkedRequest(*chunks))]
+
+    return asyncio.run(collect())
+
+
+def test_lines_split_across_chunks():
+    assert read_lines(b"first li", b"ne\nsec", b"ond\nthird\n") == [
+        "first line",
+        "second",
+        "third",
+    ]
+
+
+def test_newline_on_chunk_boundary():
+    assert read_lines(b"one\n", b"two", b"\n", b"\nthree\n") == [
+        "one",
+        "two",
+        "",
+        "three",
+    ]
+
+
+def test_multibyte_character_split_across_chunks():
+    encoded = "वह शेर है\n".encode("utf-8")
+    assert read_lines(encoded[:4], encoded[4:]) == ["वह शेर है"]
+
+
+def test_crlf_line_endings():
+    assert read_lines(b"one\r\ntwo\r", b'\n{"text": "three"}\r\n') == [
+        "one",
+        "two",
+        '{"text": "three"}',
+    ]
+
+
+def test_trailing_partial_line():
+    assert read_lines(b"one\ntwo") == ["one", "two"]
+    assert read_lines(b"one\ntwo\r") == ["one", "two"]
+    assert read_lines(b"") == []
+
+
+def test_oversized_lines_yield_none(monkeypatch):
+    monkeypatch.setattr(main, "STREAM_MAX_LINE_BYTES", 8)
+    # Complete line over the limit, then one that overflows the buffer mid-stream
+    assert read_lines(b"short\n123456789\nok\n") == ["short", None, "ok"]
+    assert read_lines(b"12345", b"67890", b"123\nafter\n") == [None, "after"]
+    assert read_lines(b"ok\n", b"1234567890") == ["ok", None]
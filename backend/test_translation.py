@@ -0,0 +1,133 @@
+"""
+Test script for the translation client's circuit breaker
+Runs offline against a fake HTTP client: python test_translation.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import translation  # noqa: E402
+from translation import TranslationClient  # noqa: E402
+
+# The fake client below replaces httpx; the module only needs it to be present
+if translation.httpx is None:
+    translation.httpx = SimpleNamespace(TimeoutException=TimeoutError)
+
+
+class HangingClient:
+    """Stands in for httpx.AsyncClient; requests never answer"""
+
+    async def get(self, url, params=None):
+        await asyncio.sleep(3600)
+
+
+def open_circuit(client: TranslationClient):
+    for _ in range(client.breaker.max_failures):
+        client.breaker.record_failure()
+    assert client.breaker.state == "open"
+
+
+async def cancel(task: asyncio.Task):
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+def test_cancelled_probe_frees_half_open_slot():
+    """A probe cancelled by the request deadline must not leave the circuit half-open"""
+
+    async def run():
+        client = TranslationClient(
+            url="http://stub.invalid/translate_a/single", timeout=60
+        )
+        client.breaker.cooldown = 0
+        client._async_client = lambda: HangingClient()
+        open_circuit(client)
+
+        probe = asyncio.create_task(client.translate("वह शेर है", "hindi"))
+        await asyncio.sleep(0.05)
+        assert client.breaker.state == "half_open"
+
+        await cancel(probe)
+
+        assert client.breaker.state != "half_open"
+        assert client.breaker.allow(), "next call should be allowed to probe"
+
+    asyncio.run(run())
+
+
+def test_cancelled_regular_call_keeps_probe_slot():
+    """Cancelling a call admitted before the circuit opened keeps the probe's slot"""
+
+    async def run():
+        client = TranslationClient(
+            url="http://stub.invalid/translate_a/single", timeout=60
+        )
+        client.breaker.cooldown = 0
+        client._async_client = lambda: HangingClient()
+
+        regular = asyncio.create_task(client.translate("वह शेर है", "hindi"))
+        await asyncio.sleep(0.05)
+        open_circuit(client)
+        probe = asyncio.create_task(client.translate("वह फूल है", "hindi"))
+        await asyncio.sleep(0.05)
+        assert client.breaker.state == "half_open"
+
+        await cancel(regular)
+        assert client.breaker.state == "half_open"
+        assert not client.breaker.allow(), "only one probe at a time"
+
+        await cancel(probe)
+        assert client.breaker.allow(), "cancelled probe should free the slot"
+
+    asyncio.run(run())
+
+
+def test_lost_probe_reopens_circuit():
+    """A probe that never reports back reopens the circuit after probe_timeout"""
+    client = TranslationClient(url="http://stub.invalid/translate_a/single", timeout=60)
+    client.breaker.cooldown = 0
+    open_circuit(client)
+
+    assert client.breaker.allow()
+    assert client.breaker.state == "half_open"
+    assert not client.breaker.allow(), "only one probe at a time"
+
+    client.breaker.probe_timeout = 0
+    assert (
+        client.breaker.allow()
+    ), "lost probe should reopen the circuit, then probe again"
+    assert client.breaker.state == "half_open"
+
+
+def run_all_tests():
+    print("\n" + "=" * 60)
+    print("Translation Circuit Breaker Tests")
+    print("=" * 60)
+
+    tests = [
+        test_cancelled_probe_frees_half_open_slot,
+        test_cancelled_regular_call_keeps_probe_slot,
+        test_lost_probe_reopens_circuit,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"✗ {test.__name__}: {e}")
+
+    print(f"\n{len(tests) - failed}/{len(tests)} passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run_all_tests() else 1)
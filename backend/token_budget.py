@@ -0,0 +1,175 @@
+"""
+Token-length statistics and per-language token budgets
+
+Inputs are measured in tokens rather than characters. Every scored text feeds
+a per-language length histogram; the histogram drives a recommended
+max_length per language, over-long inputs are rejected before inference and
+batches are padded to a multiple of PAD_TO_MULTIPLE_OF instead of 512.
+"""
+
+import math
+import os
+import threading
+from typing import Dict, List, Optional
+
+# Token budget configuration
+TOKEN_MAX_LENGTH = int(os.getenv("TOKEN_MAX_LENGTH", "512"))
+# Pad batches to a multiple of this (0 = pad to longest only)
+PAD_TO_MULTIPLE_OF = int(os.getenv("PAD_TO_MULTIPLE_OF", "8"))
+TOKEN_LIMIT_AUTO = os.getenv("TOKEN_LIMIT_AUTO", "false").lower() == "true"
+TOKEN_LIMIT_PERCENTILE = float(os.getenv("TOKEN_LIMIT_PERCENTILE", "99.5"))
+TOKEN_LIMIT_MIN_SAMPLES = int(os.getenv("TOKEN_LIMIT_MIN_SAMPLES", "1000"))
+# Cheap character guard applied before tokenizing
+MAX_INPUT_CHARS = int(os.getenv("MAX_INPUT_CHARS", "5000"))
+
+# Longest length tracked individually; longer inputs share the last bucket
+HISTOGRAM_CAP = 2048
+
+# Fast tokenizers keep truncation/padding state in the Rust backend, so
+# concurrent calls with different settings on one (possibly shared) tokenizer
+# must not interleave
+_tokenizer_locks: Dict[int, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(tokenizer) -> threading.Lock:
+    with _locks_guard:
+        return _tokenizer_locks.setdefault(id(tokenizer), threading.Lock())
+
+
+def tokenize(tokenizer, texts: List[str], **kwargs):
+    """Call a tokenizer under its lock"""
+    with _lock_for(tokenizer):
+        return tokenizer(texts, **kwargs)
+
+
+def count_tokens(tokenizer, texts: List[str]) -> List[int]:
+    """Untruncated token counts, including special tokens"""
+    return [len(ids) for ids in tokenize(tokenizer, texts)["input_ids"]]
+
+
+def round_up(value: int, multiple: int) -> int:
+    """Round up to a multiple (no-op when multiple <= 1)"""
+    if multiple <= 1:
+        return value
+    return int(math.ceil(value / multiple) * multiple)
+
+
+class TokenLengthStats:
+    """Histogram of token lengths seen for one language"""
+
+    def __init__(self):
+        self.counts = [0] * (HISTOGRAM_CAP + 1)
+        self.total = 0
+        self.total_tokens = 0
+        self.longest = 0
+        self.rejected = 0
+
+    def record(self, length: int):
+        self.counts[min(length, HISTOGRAM_CAP)] += 1
+        self.total += 1
+        self.total_tokens += length
+        self.longest = max(self.longest, length)
+
+    def percentile(self, p: float) -> Optional[int]:
+        """Smallest length covering p percent of observations"""
+        if not self.total:
+            return None
+        target = self.total * p / 100
+        seen = 0
+        for length, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return length
+        return HISTOGRAM_CAP
+
+    def summary(self) -> dict:
+        return {
+            "count": self.total,
+            "mean": round(self.total_tokens / self.total, 1) if self.total else None,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.longest,
+            "rejected": self.rejected,
+        }
+
+
+class TokenBudget:
+    """Per-language token statistics and max_length limits"""
+
+    def __init__(self):
+        self.stats: Dict[str, TokenLengthStats] = {}
+
+    def _stats(self, language: str) -> TokenLengthStats:
+        if language not in self.stats:
+            self.stats[language] = TokenLengthStats()
+        return self.stats[language]
+
+    def record(self, language: str, lengths: List[int]):
+        stats = self._stats(language)
+        for length in lengths:
+            stats.record(length)
+
+    def record_rejection(self, language: str, count: int = 1):
+        self._stats(language).rejected += count
+
+    def recommended_max_length(self, language: str) -> Optional[int]:
+        """Observed length percentile rounded up to the padding multiple"""
+        stats = self.stats.get(language)
+        if not stats or stats.total < TOKEN_LIMIT_MIN_SAMPLES:
+            return None
+        return round_up(
+            stats.percentile(TOKEN_LIMIT_PERCENTILE), PAD_TO_MULTIPLE_OF or 1
+        )
+
+    def max_length(self, language: str, tokenizer=None) -> int:
+        """
+        Token limit for a language:
+        TOKEN_MAX_LENGTH_<LANGUAGE> if set, else the recommended length when
+        TOKEN_LIMIT_AUTO is on and enough samples exist, else TOKEN_MAX_LENGTH;
+        never above what the model supports
+        """
+        override = os.getenv(f"TOKEN_MAX_LENGTH_{language.upper()}")
+        if override:
+            limit = int(override)
+        elif TOKEN_LIMIT_AUTO and self.recommended_max_length(language):
+            limit = self.recommended_max_length(language)
+        else:
+            limit = TOKEN_MAX_LENGTH
+
+        # model_max_length is a huge sentinel when the checkpoint doesn't set it
+        model_limit = getattr(tokenizer, "model_max_length", None)
+        if model_limit and model_limit < 100_000:
+            limit = min(limit, model_limit)
+        return limit
+
+    def truncation_length(self, language: str, tokenizer=None) -> int:
+        """
+        max_length to pass to the tokenizer: the token limit rounded up to the
+        padding multiple (tokenizers require this when both are set)
+        """
+        limit = self.max_length(language, tokenizer)
+        multiple = PAD_TO_MULTIPLE_OF or 1
+        padded = round_up(limit, multiple)
+
+        model_limit = getattr(tokenizer, "model_max_length", None)
+        if model_limit and model_limit < 100_000 and padded > model_limit:
+            padded = max(multiple, model_limit // multiple * multiple)
+        return padded
+
+    def summary(self, tokenizers: dict) -> dict:
+        """Stats and limits for every language seen or loaded"""
+        languages = sorted(set(self.stats) | set(tokenizers))
+        return {
+            language: {
+                **self._stats(language).summary(),
+                "max_length": self.max_length(language, tokenizers.get(language)),
+                "recommended_max_length": self.recommended_max_length(language),
+            }
+            for language in languages
+        }
+
+
+# Shared instance used by the API
+token_budget = TokenBudget()
@@ -0,0 +1,295 @@
+"""
+Translation client
+
+One pooled HTTP client shared by every request, talking to a Google
+Translate-compatible endpoint (TRANSLATION_URL, the free "gtx" API by
+default; point it at a local stub for tests, see translation_stub.py). Each
+call is cut off after TRANSLATION_TIMEOUT seconds. After
+TRANSLATION_BREAKER_FAILURES consecutive failures the circuit breaker opens
+and calls return the placeholder immediately for TRANSLATION_BREAKER_COOLDOWN
+seconds; then a single probe call decides whether it closes again. A probe
+that is cancelled (request deadline, client disconnect) frees the slot for the
+next call, and one that never reports back reopens the circuit.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+# Translation configuration
+TRANSLATION_URL = os.getenv(
+    "TRANSLATION_URL", "https://translate.googleapis.com/translate_a/single"
+)
+TRANSLATION_TIMEOUT = float(os.getenv("TRANSLATION_TIMEOUT", "5"))
+TRANSLATION_MAX_CONNECTIONS = int(os.getenv("TRANSLATION_MAX_CONNECTIONS", "20"))
+TRANSLATION_BREAKER_FAILURES = int(os.getenv("TRANSLATION_BREAKER_FAILURES", "5"))
+TRANSLATION_BREAKER_COOLDOWN = float(os.getenv("TRANSLATION_BREAKER_COOLDOWN", "30"))
+
+LANGUAGE_CODES = {"hindi": "hi", "tamil": "ta", "kannada": "kn", "telugu": "te"}
+
+
+def unavailable_message(text: str) -> str:
+    return f"[Translation temporarily unavailable. Original text: '{text}']"
+
+
+def not_installed_message(text: str, source_language: str) -> str:
+    return (
+        f"[Translation of '{text}' from {source_language} to English. "
+        "Install 'httpx' for automatic translation.]"
+    )
+
+
+def parse_translation(data) -> str:
+    """Join the translated segments of a gtx response: [[["text", "original", ...]]]"""
+    translated = "".join(segment[0] for segment in data[0] if segment and segment[0])
+    if not translated:
+        raise ValueError("Empty translation in response")
+    return translated
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures; lets one probe through after the cool-down"""
+
+    # Token for calls let through while the circuit is closed; each probe gets its own
+    REGULAR = object()
+
+    def __init__(
+        self,
+        max_failures: int = TRANSLATION_BREAKER_FAILURES,
+        cooldown: float = TRANSLATION_BREAKER_COOLDOWN,
+        probe_timeout: float = TRANSLATION_TIMEOUT,
+    ):
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.probe_timeout = probe_timeout
+        self.state = "closed"  # closed | open | half_open
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started_at = 0.0
+        self._probe: Optional[object] = None
+        self.times_opened = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> Optional[object]:
+        """Token for a call that may go ahead, or None if the circuit rejects it"""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == "closed":
+                return self.REGULAR
+            if (
+                self.state == "half_open"
+                and now - self.probe_started_at >= self.probe_timeout
+            ):
+                # The probe never reported back; count it as failed
+                logger.warning("⚠️ Translation probe did not finish, reopening circuit")
+                self.failures += 1
+                self.state = "open"
+                self.opened_at = now
+            if self.state == "open" and now - self.opened_at >= self.cooldown:
+                self.state = "half_open"
+                self.probe_started_at = now
+                self._probe = object()
+                logger.info("Translation circuit half-open, sending a probe request")
+                return self._probe
+            self.rejected += 1
+            return None
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                logger.info("✓ Translation circuit closed")
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.max_failures:
+                if self.state != "open":
+                    self.times_opened += 1
+                    logger.warning(
+                        f"⚠️ Translation circuit open for {self.cooldown:g}s after "
+                        f"{self.failures} failures"
+                    )
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def abandon_probe(self, token: object):
+        """A call was cancelled; if it held the half-open probe, free the slot"""
+        with self._lock:
+            # Other cancelled callers must not free the slot while the probe runs
+            if self.state == "half_open" and token is self._probe:
+                self.failures += 1
+                # opened_at is kept: the cool-down has passed and the next call probes
+                self.state = "open"
+
+    def stats(self) -> dict:
+        with self._lock:
+            retry_in = (
+                self.cooldown - (time.monotonic() - self.opened_at)
+                if self.state == "open"
+                else None
+            )
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "max_failures": self.max_failures,
+                "cooldown_seconds": self.cooldown,
+                "retry_in_seconds": (
+                    round(max(retry_in, 0), 1) if retry_in is not None else None
+                ),
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+            }
+
+
+class TranslationClient:
+    """Shared, pooled translation client with call deadlines and a circuit breaker"""
+
+    def __init__(
+        self,
+        url: str = TRANSLATION_URL,
+        timeout: float = TRANSLATION_TIMEOUT,
+        max_connections: int = TRANSLATION_MAX_CONNECTIONS,
+    ):
+        self.url = url
+        self.timeout = timeout
+        self.max_connections = max_connections
+        # A probe reports back within its own deadline; this only catches lost ones
+        self.breaker = CircuitBreaker(probe_timeout=2 * timeout)
+        self._client = None
+        self._client_loop = None
+        self._sync_client = None
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+
+    def _params(self, text: str, source_language: str) -> dict:
+        return {
+            "client": "gtx",
+            "sl": LANGUAGE_CODES.get(source_language, "auto"),
+            "tl": "en",
+            "dt": "t",
+            "q": text,
+        }
+
+    def _limits(self):
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections,
+        )
+
+    def _async_client(self):
+        # Pooled connections belong to the loop that opened them
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout, limits=self._limits()
+            )
+            self._client_loop = loop
+        return self._client
+
+    def _record(self, error: Optional[Exception], text: str) -> Optional[str]:
+        """Update the breaker; returns the placeholder for a failed call"""
+        if error is None:
+            self.breaker.record_success()
+            return None
+        self.failures += 1
+        if isinstance(error, (asyncio.TimeoutError, httpx.TimeoutException)):
+            self.timeouts += 1
+            logger.error(f"❌ Translation timed out after {self.timeout:g}s")
+        else:
+            logger.error(f"Translation error: {str(error)}")
+        self.breaker.record_failure()
+        return unavailable_message(text)
+
+    async def translate(self, text: str, source_language: str) -> str:
+        """English translation of text, or a [placeholder] if the service is down"""
+        if httpx is None:
+            logger.warning("httpx not installed, using placeholder")
+            return not_installed_message(text, source_language)
+        token = self.breaker.allow()
+        if token is None:
+            return unavailable_message(text)
+
+        self.calls += 1
+        try:
+            response = await asyncio.wait_for(
+                self._async_client().get(
+                    self.url, params=self._params(text, source_language)
+                ),
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            translated = parse_translation(response.json())
+        except asyncio.CancelledError:
+            # Request deadline or client disconnect; not a verdict on the service
+            self.breaker.abandon_probe(token)
+            raise
+        except Exception as e:
+            return self._record(e, text)
+
+        self._record(None, text)
+        logger.info(f"Translation successful: {translated}")
+        return translated
+
+    def translate_sync(self, text: str, source_language: str) -> str:
+        """Blocking variant for callers outside the event loop"""
+        if httpx is None:
+            logger.warning("httpx not installed, using placeholder")
+            return not_installed_message(text, source_language)
+        token = self.breaker.allow()
+        if token is None:
+            return unavailable_message(text)
+
+        if self._sync_client is None:
+            self._sync_client = httpx.Client(
+                timeout=self.timeout, limits=self._limits()
+            )
+
+        self.calls += 1
+        try:
+            response = self._sync_client.get(
+                self.url, params=self._params(text, source_language)
+            )
+            response.raise_for_status()
+            translated = parse_translation(response.json())
+        except Exception as e:
+            return self._record(e, text)
+        except BaseException:
+            self.breaker.abandon_probe(token)
+            raise
+
+        self._record(None, text)
+        logger.info(f"Translation successful: {translated}")
+        return translated
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._sync_client is not None:
+            self._sync_client.close()
+            self._sync_client = None
+
+    def stats(self) -> dict:
+        return {
+            "url": self.url,
+            "timeout_seconds": self.timeout,
+            "max_connections": self.max_connections,
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "circuit": self.breaker.stats(),
+        }
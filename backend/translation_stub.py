@@ -0,0 +1,75 @@
+"""
+Local stand-in for the translation service
+
+Answers TRANSLATION_URL requests in the gtx response format with
+"[en] <text>", optionally slowly or failing, so translation timeouts and the
+circuit breaker can be exercised without network access:
+
+    python translation_stub.py --port 8765 --delay 0.2 --fail-rate 0.5
+    TRANSLATION_URL=http://127.0.0.1:8765/translate_a/single python main.py
+"""
+
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def make_handler(delay: float, fail_rate: float):
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            if random.random() < fail_rate:
+                self.send_error(503, "Stub failure")
+                return
+
+            query = parse_qs(urlparse(self.path).query)
+            text = query.get("q", [""])[0]
+            body = json.dumps(
+                [
+                    [[f"[en] {text}", text, None, None]],
+                    None,
+                    query.get("sl", ["auto"])[0],
+                ]
+            )
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.end_headers()
+            self.wfile.write(body.encode("utf-8"))
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Stub translation server for local testing"
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--delay", type=float, default=0.0, help="Seconds to wait before answering"
+    )
+    parser.add_argument(
+        "--fail-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of requests answered with 503",
+    )
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", args.port), make_handler(args.delay, args.fail_rate)
+    )
+    print(
+        f"Translation stub listening on http://127.0.0.1:{args.port}/translate_a/single"
+    )
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()